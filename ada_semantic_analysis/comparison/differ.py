@@ -1,6 +1,9 @@
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from ..core.skm import SystemKnowledgeModel
 from ..core.fingerprinting import FingerprintGenerator, BehavioralFingerprint
+from .rename_matcher import RenameMatcher
+from .similarity import SimilarityMatcher
+from .impact import ImpactAnalyzer
 
 class Change:
     def __init__(self, file_name: str, line_range: str, classification: str, affected_files: str, risk: str, tests: str):
@@ -12,16 +15,66 @@ class Change:
         self.tests = tests
 
 class SemanticDiffer:
-    def __init__(self, skm_old: SystemKnowledgeModel, skm_new: SystemKnowledgeModel):
+    def __init__(self, skm_old: SystemKnowledgeModel, skm_new: SystemKnowledgeModel, unchanged_procedures: Optional[Set[str]] = None,
+                 similarity_threshold: Optional[float] = 0.8, max_impact_depth: Optional[int] = None):
         self.skm_old = skm_old
         self.skm_new = skm_new
+        # Minimum Jaccard similarity for fuzzy rename matching (None disables it)
+        self.similarity_threshold = similarity_threshold
+        # Procedures known to come only from byte-identical files (see
+        # ParallelIngestor.ingest_pair); their fingerprints are not compared.
+        self.unchanged_procedures = unchanged_procedures or set()
+        # Deepest caller level reported as impacted (None: unlimited)
+        self.max_impact_depth = max_impact_depth
         self.changes: List[Change] = []
+        # Added, removed (including renamed) and modified procedures, set by diff()
+        self.changed_procedures: Set[str] = set()
+        self._analyzers: Dict[int, ImpactAnalyzer] = {}
+        self._affected_memo: Dict[Tuple[int, str], str] = {}
     
     def diff(self) -> List[Change]:
         self.changes = []
         self._diff_procedures()
         return self.changes
 
+    def _affected(self, target_name: str, skm: SystemKnowledgeModel) -> str:
+        """
+        Impact Propagation: direct callers with their call-site lines, then
+        transitive callers with their call depth. Memoized per target.
+        """
+        key = (id(skm), target_name)
+        if key in self._affected_memo:
+            return self._affected_memo[key]
+
+        if id(skm) not in self._analyzers:
+            self._analyzers[id(skm)] = ImpactAnalyzer(skm.compact_call_graph, skm.resolve_procedure)
+        analyzer = self._analyzers[id(skm)]
+
+        direct = analyzer.direct_callers(target_name)
+        callers = []
+        for p in sorted(direct):
+            lines = direct[p]
+            if lines:
+                line_str = ", ".join(map(str, lines))
+                callers.append(f"{p}:{line_str}")
+            else:
+                proc = self.skm_new.procedures.get(p)
+                if not proc and self.skm_old: proc = self.skm_old.procedures.get(p)
+                line = proc.start_line if proc else "?"
+                callers.append(f"{p}:Start-{line}")
+
+        indirect = analyzer.transitive_callers(target_name)
+        for p in sorted(indirect, key=lambda n: (indirect[n], n)):
+            if p in direct:
+                continue
+            if self.max_impact_depth is not None and indirect[p] > self.max_impact_depth:
+                continue
+            callers.append(f"{p}:Depth-{indirect[p]}")
+
+        result = "\n".join(callers) if callers else "None Detected"
+        self._affected_memo[key] = result
+        return result
+
     def _diff_procedures(self):
         old_procs = self.skm_old.procedures
         new_procs = self.skm_new.procedures
@@ -32,94 +85,59 @@ class SemanticDiffer:
         added = new_names - old_names
         removed = old_names - new_names
         common = old_names & new_names
+        self.changed_procedures = added | removed
         
-        # Helper to find callers (Impact Propagation)
-        def get_affected(target_name, graph):
-            affected_set = set()
-            
-            # 1. Check Full Name
-            if graph.has_node(target_name):
-                affected_set.update(graph.predecessors(target_name))
-            
-            # 2. Check Simple Name (Robustness for unqualified calls)
-            simple = target_name.split('.')[-1]
-            if graph.has_node(simple):
-                affected_set.update(graph.predecessors(simple))
-                
-            if not affected_set:
-                return "None Detected"
-                
-            callers = []
-            for p in sorted(affected_set):
-                 # Try to get edge lines from full name link if possible
-                 edge_data = graph.get_edge_data(p, target_name)
-                 lines = edge_data.get('lines', []) if edge_data else []
-                 if not lines and simple != target_name:
-                     edge_data = graph.get_edge_data(p, simple)
-                     lines = edge_data.get('lines', []) if edge_data else []
-
-                 if lines:
-                     line_str = ", ".join(map(str, lines))
-                     callers.append(f"{p}:{line_str}")
-                 else:
-                     proc = self.skm_new.procedures.get(p)
-                     if not proc and self.skm_old: proc = self.skm_old.procedures.get(p)
-                     line = proc.start_line if proc else "?"
-                     callers.append(f"{p}:Start-{line}")
-
-            return "\n".join(callers)
+        def get_affected(target_name, skm):
+            return self._affected(target_name, skm)
 
         # --- RENAME DETECTION ---
         # Heuristic: If A is removed and B is added, and they have high similarity, assume Rename.
         renamed_map = {} # Removed Name -> New Name
-        processed_added = set()
-        
-        for r_name in list(removed):
-            best_match = None
+
+        def log_rename(r_name, best_match, similarity=1.0):
+            renamed_map[r_name] = best_match
+            added.remove(best_match)
+            removed.remove(r_name)
             
-            p_old = old_procs[r_name]
-            fp_old = BehavioralFingerprint(p_old).fingerprint
-            
-            for a_name in list(added):
-                if a_name in processed_added: continue
-                
-                p_new = new_procs[a_name]
-                fp_new = BehavioralFingerprint(p_new).fingerprint
-                
-                # Criteria 1: Exact structural hash match (Identity Rename)
-                if fp_old == fp_new:
-                    best_match = a_name
-                    break
-                
-                # Criteria 2: Signature + Logic Match (Close enough)
-                # Same inputs/outputs and slightly different internal complexity/calls?
-                if fp_old['inputs'] == fp_new['inputs'] and fp_old['outputs'] == fp_new['outputs']:
-                    # Weak signal, check complexity
-                    if abs(fp_old['complexity'] - fp_new['complexity']) <= 1:
-                        best_match = a_name
-                        break
+            label = f"{r_name} -> {best_match}"
+            if similarity < 1.0:
+                label += f", {similarity:.0%} similar"
             
+            # Log Rename
+            affected = get_affected(best_match, self.skm_new)
+            self.changes.append(Change(
+                file_name=best_match.split('.')[0] + ".adb",
+                line_range=f"{new_procs[best_match].start_line}-{new_procs[best_match].end_line}",
+                classification=f"Renamed Procedure ({label})",
+                affected_files=affected,
+                risk="Low", 
+                tests=f"Unit: {best_match}; Regress: {r_name} Callers"
+            ))
+
+        # Criteria 0: Same inputs/outputs, similar calls/reads/writes/statements (renamed and lightly edited)
+        # Best Jaccard match via MinHash/LSH; see SimilarityMatcher.
+        if self.similarity_threshold is not None:
+            similar = SimilarityMatcher(((a_name, new_procs[a_name]) for a_name in sorted(added)),
+                                        threshold=self.similarity_threshold)
+            for r_name in sorted(removed):
+                found = similar.match(r_name, old_procs[r_name])
+                if found:
+                    log_rename(r_name, *found)
+
+        # Criteria 1: Exact structural hash match (Identity Rename)
+        # Criteria 2: Signature + Logic Match (same inputs/outputs, complexity +/-1)
+        # First match in name order wins; see RenameMatcher.
+        matcher = RenameMatcher((a_name, new_procs[a_name]) for a_name in sorted(added))
+        
+        for r_name in sorted(removed):
+            best_match = matcher.match(old_procs[r_name])
             if best_match:
-                renamed_map[r_name] = best_match
-                processed_added.add(best_match)
-                added.remove(best_match)
-                removed.remove(r_name)
-                
-                # Log Rename
-                affected = get_affected(best_match, self.skm_new.call_graph)
-                self.changes.append(Change(
-                    file_name=best_match.split('.')[0] + ".adb",
-                    line_range=f"{new_procs[best_match].start_line}-{new_procs[best_match].end_line}",
-                    classification=f"Renamed Procedure ({r_name} -> {best_match})",
-                    affected_files=affected,
-                    risk="Low", 
-                    tests=f"Unit: {best_match}; Regress: {r_name} Callers"
-                ))
+                log_rename(r_name, best_match)
 
         # --- STANDARD ADD/REMOVE ---
         for name in added:
             proc = new_procs[name]
-            affected = get_affected(name, self.skm_new.call_graph)
+            affected = get_affected(name, self.skm_new)
             
             self.changes.append(Change(
                 file_name=name.split('.')[0] + ".adb", 
@@ -136,21 +154,22 @@ class SemanticDiffer:
                 file_name=name.split('.')[0] + ".adb",
                 line_range="Deleted",
                 classification="Variable/Code Removal",
-                affected_files=get_affected(name, self.skm_old.call_graph), # Check who called it in old
+                affected_files=get_affected(name, self.skm_old), # Check who called it in old
                 risk="High",
                 tests="Regression: Check callers"
             ))
             
         # --- MODIFICATION ---
-        for name in common:
-            pf_old = BehavioralFingerprint(old_procs[name])
-            pf_new = BehavioralFingerprint(new_procs[name])
+        for name in common - self.unchanged_procedures:
+            pf_old = BehavioralFingerprint.of(old_procs[name])
+            pf_new = BehavioralFingerprint.of(new_procs[name])
             
             if pf_old.hash != pf_new.hash:
+                self.changed_procedures.add(name)
                 details, risk = self._analyze_modification(pf_old.fingerprint, pf_new.fingerprint, name)
                 
                 # Impact Analysis
-                affected = get_affected(name, self.skm_new.call_graph)
+                affected = get_affected(name, self.skm_new)
                 
                 # Test Recommendation
                 tests = f"Verify {name}"
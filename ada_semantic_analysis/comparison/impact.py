@@ -0,0 +1,181 @@
+import heapq
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from ..core.call_graph import CompactCallGraph
+
+class ImpactAnalyzer:
+    """
+    Transitive "who is affected" queries over an SKM call graph.
+
+    Calls are recorded by the name used at the call site, which is often
+    the simple or a partially qualified name, so a procedure "Pkg.Proc" is
+    called through the "Pkg.Proc", "Proc" and e.g. "pkg.proc" nodes.
+    `resolve` maps a call-site name to the qualified procedures it may
+    denote (SystemKnowledgeModel.resolve_procedure); without it only the
+    simple name is tried. The analyzer folds all aliases into one
+    called-by relation, condenses it into strongly connected components
+    (mutually recursive procedures) once, and answers "all transitive
+    callers of X, with depth" by a walk over the component DAG. Answers
+    are memoized per target for the lifetime of the analyzer.
+
+    Depth counts call levels: direct callers are at 1. Within the target's
+    own recursive cycle depths are exact; above it they are counted between
+    components, so all members of an upstream cycle share the depth at which
+    the cycle is first reached.
+    """
+    def __init__(self, graph: CompactCallGraph, resolve: Optional[Callable[[str], Iterable[str]]] = None):
+        self.graph = graph
+        n = graph.number_of_nodes()
+
+        # aliases[v] = other nodes whose name denotes v, in id order.
+        self._aliases: Dict[int, List[int]] = {}
+        if resolve is None:
+            for i in range(n):
+                simple = graph.id_of(_simple(graph.name_of(i)))
+                if simple is not None and simple != i:
+                    self._aliases[i] = [simple]
+        else:
+            for j in range(n):
+                for qualified in resolve(graph.name_of(j)):
+                    i = graph.id_of(qualified)
+                    if i is not None and i != j:
+                        self._aliases.setdefault(i, []).append(j)
+
+        # called_by[v] = callers of v, including callers of its aliases.
+        direct = [graph.predecessor_ids(v) for v in range(n)]
+        called_by: List[Set[int]] = [set(d) for d in direct]
+        for i, alias_ids in self._aliases.items():
+            for a in alias_ids:
+                called_by[i].update(direct[a])
+
+        self._called_by = called_by
+        self._comp = self._strongly_connected(called_by)
+        n_comps = max(self._comp, default=-1) + 1
+        self._members: List[List[int]] = [[] for _ in range(n_comps)]
+        for node, c in enumerate(self._comp):
+            self._members[c].append(node)
+        self._dag: List[Set[int]] = [set() for _ in range(n_comps)]
+        for v, callers in enumerate(called_by):
+            for u in callers:
+                if self._comp[u] != self._comp[v]:
+                    self._dag[self._comp[v]].add(self._comp[u])
+
+        self._memo: Dict[str, Dict[str, int]] = {}
+
+    def direct_callers(self, target: str) -> Dict[str, List[int]]:
+        """Callers of `target` (under any of its names) with their call-site lines."""
+        callers: Dict[str, List[int]] = {}
+        for i in self._node_ids(target):
+            name = self.graph.name_of(i)
+            for p in self.graph.predecessors(name):
+                if p not in callers or not callers[p]:
+                    callers[p] = self.graph.edge_lines(p, name)
+        return callers
+
+    def _node_ids(self, target: str) -> List[int]:
+        """The target's own node followed by its aliases."""
+        i = self.graph.id_of(target)
+        if i is None:
+            simple = self.graph.id_of(_simple(target))
+            return [] if simple is None else [simple]
+        return [i] + self._aliases.get(i, [])
+
+    def transitive_callers(self, target: str) -> Dict[str, int]:
+        """
+        Every procedure that reaches `target` through calls, mapped to its
+        minimum call depth (shared by the members of an upstream cycle).
+        """
+        if target in self._memo:
+            return self._memo[target]
+
+        comp, called_by = self._comp, self._called_by
+        targets = self._node_ids(target)
+        start = {comp[i] for i in targets}
+
+        # Node by node inside the target's component(s); each upstream
+        # component is entered one call above the member it calls.
+        node_depth = dict.fromkeys(targets, 0)
+        entry: Dict[int, int] = {}
+        queue = deque(targets)
+        while queue:
+            v = queue.popleft()
+            depth = node_depth[v] + 1
+            for u in called_by[v]:
+                c = comp[u]
+                if c not in start:
+                    if depth < entry.get(c, depth + 1):
+                        entry[c] = depth
+                elif u not in node_depth:
+                    node_depth[u] = depth
+                    queue.append(u)
+
+        depths: Dict[str, int] = {self.graph.name_of(v): d for v, d in node_depth.items() if d}
+        heap = [(d, c) for c, d in entry.items()]
+        heapq.heapify(heap)
+        done: Set[int] = set()
+        while heap:
+            depth, c = heapq.heappop(heap)
+            if c in done:
+                continue
+            done.add(c)
+            for m in self._members[c]:
+                depths[self.graph.name_of(m)] = depth
+            for up in self._dag[c]:
+                if up not in done:
+                    heapq.heappush(heap, (depth + 1, up))
+
+        depths.pop(target, None)
+        self._memo[target] = depths
+        return depths
+
+    @staticmethod
+    def _strongly_connected(adj: List[Set[int]]) -> List[int]:
+        """Iterative Tarjan; returns the component id of every node."""
+        n = len(adj)
+        index = [-1] * n
+        low = [0] * n
+        comp = [-1] * n
+        on_stack = [False] * n
+        stack: List[int] = []
+        counter = 0
+        n_comps = 0
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            work = [(root, iter(adj[root]))]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            while work:
+                v, it = work[-1]
+                advanced = False
+                for w in it:
+                    if index[w] == -1:
+                        index[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        on_stack[w] = True
+                        work.append((w, iter(adj[w])))
+                        advanced = True
+                        break
+                    elif on_stack[w]:
+                        low[v] = min(low[v], index[w])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[v])
+                if low[v] == index[v]:
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        comp[w] = n_comps
+                        if w == v:
+                            break
+                    n_comps += 1
+        return comp
+
+def _simple(name: str) -> str:
+    return name.split('.')[-1]
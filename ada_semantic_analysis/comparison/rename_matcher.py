@@ -0,0 +1,59 @@
+from collections import defaultdict, deque
+from typing import Dict, Iterable, Optional, Tuple
+from ..core.skm import ProcedureInfo
+from ..core.fingerprinting import BehavioralFingerprint
+
+class RenameMatcher:
+    """
+    Indexed replacement for the removed x added rename scan.
+
+    The original rule takes, for each removed procedure, the first added
+    candidate (in candidate order) that either has an identical fingerprint
+    or the same inputs/outputs with complexity within COMPLEXITY_BAND.
+    Candidates are bucketed by both keys up front; each bucket is a queue in
+    candidate order, so the first match is the earliest untaken head among
+    the few buckets a procedure can fall into. Matching is near-linear in
+    the number of procedures and returns exactly the same pairs.
+    """
+    COMPLEXITY_BAND = 1
+
+    def __init__(self, candidates: Iterable[Tuple[str, ProcedureInfo]]):
+        self._order: Dict[str, int] = {}
+        self._exact = defaultdict(deque) # fingerprint hash -> names
+        self._coarse = defaultdict(deque) # (inputs, outputs, complexity) -> names
+        self._taken = set()
+
+        for name, proc in candidates:
+            fp = BehavioralFingerprint.of(proc)
+            self._order[name] = len(self._order)
+            self._exact[fp.hash].append(name)
+            self._coarse[self._coarse_key(fp.fingerprint)].append(name)
+
+    def match(self, proc: ProcedureInfo) -> Optional[str]:
+        """Returns the first untaken candidate matching `proc` and marks it taken."""
+        fp = BehavioralFingerprint.of(proc)
+        inputs, outputs, complexity = self._coarse_key(fp.fingerprint)
+
+        buckets = [self._exact.get(fp.hash)]
+        for delta in range(-self.COMPLEXITY_BAND, self.COMPLEXITY_BAND + 1):
+            buckets.append(self._coarse.get((inputs, outputs, complexity + delta)))
+
+        best = None
+        for bucket in buckets:
+            head = self._head(bucket)
+            if head is not None and (best is None or self._order[head] < self._order[best]):
+                best = head
+
+        if best is not None:
+            self._taken.add(best)
+        return best
+
+    def _head(self, bucket) -> Optional[str]:
+        # Taken names are dropped lazily; each one is popped at most once per bucket.
+        while bucket and bucket[0] in self._taken:
+            bucket.popleft()
+        return bucket[0] if bucket else None
+
+    @staticmethod
+    def _coarse_key(fingerprint: dict):
+        return tuple(fingerprint['inputs']), tuple(fingerprint['outputs']), fingerprint['complexity']
@@ -0,0 +1,319 @@
+import json
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+from ..core.skm import SystemKnowledgeModel
+
+class InvariantViolation:
+    def __init__(self, rule_id: str, description: str, severity: str, location: str):
+        self.rule_id = rule_id
+        self.description = description
+        self.severity = severity
+        self.location = location
+
+@dataclass(frozen=True)
+class NamePattern:
+    """Selects qualified names: any of `contains` (case-insensitive substrings) or `regex`."""
+    contains: Tuple[str, ...] = ()
+    regex: Optional[str] = None
+
+    def __post_init__(self):
+        object.__setattr__(self, "contains", tuple(s.lower() for s in self.contains))
+
+    def matches(self, name: str, lowered: Optional[str] = None) -> bool:
+        if lowered is None:
+            lowered = name.lower()
+        if any(s in lowered for s in self.contains):
+            return True
+        return self.regex is not None and re.search(self.regex, name, re.IGNORECASE) is not None
+
+@dataclass
+class CallPreservationRule:
+    """
+    A procedure that called a `targets` procedure in Old must still call
+    one in New (unless the caller itself is gone).
+    """
+    rule_id: str
+    targets: NamePattern
+    severity: str = "High"
+    message: str = "Procedure '{caller}' stopped calling required procedures. Previously called: {callees}"
+
+    def patterns(self) -> List[Tuple[str, NamePattern]]:
+        return [("procedures", self.targets)]
+
+    def evaluate(self, plan: "QueryPlan") -> List[InvariantViolation]:
+        # Who called which target, by the name used at the call site.
+        called_old: Dict[str, Set[str]] = {}
+        still_calling: Set[str] = set()
+        if plan.callers is None:
+            for target in plan.old_procedures(self.targets):
+                for caller, names in plan.skm_old.callers_of(target).items():
+                    called_old.setdefault(caller, set()).update(names)
+            for target in plan.new_procedures(self.targets):
+                still_calling.update(plan.skm_new.callers_of(target))
+        else:
+            for caller in plan.callers:
+                if caller in plan.skm_old.procedures and caller in plan.skm_new.procedures:
+                    names = plan.calls_to(plan.skm_old, caller, self.targets)
+                    if names:
+                        called_old[caller] = names
+                        if plan.calls_to(plan.skm_new, caller, self.targets):
+                            still_calling.add(caller)
+
+        violations = []
+        for caller in sorted(called_old):
+            if caller not in plan.skm_new.procedures or caller in still_calling:
+                continue
+            violations.append(InvariantViolation(
+                rule_id=self.rule_id,
+                description=self.message.format(caller=caller, callees=", ".join(sorted(called_old[caller]))),
+                severity=self.severity,
+                location=caller
+            ))
+        return violations
+
+@dataclass
+class ProtectedWriteRule:
+    """A `variables` variable that still exists in New must not gain writers."""
+    rule_id: str
+    variables: NamePattern
+    severity: str = "Medium"
+    message: str = "Protected variable '{variable}' has new writer(s): {writers}"
+
+    def patterns(self) -> List[Tuple[str, NamePattern]]:
+        return [("variables", self.variables)]
+
+    def evaluate(self, plan: "QueryPlan") -> List[InvariantViolation]:
+        if plan.variables is None:
+            candidates = plan.old_variables(self.variables)
+        else:
+            candidates = [v for v in plan.variables if v in plan.skm_old.variables and self.variables.matches(v)]
+
+        violations = []
+        for var in sorted(candidates):
+            if var not in plan.skm_new.variables:
+                continue
+            new_writers = plan.skm_new.writers.get(var, set()) - plan.skm_old.writers.get(var, set())
+            if new_writers:
+                violations.append(InvariantViolation(
+                    rule_id=self.rule_id,
+                    description=self.message.format(variable=var, writers=", ".join(sorted(new_writers))),
+                    severity=self.severity,
+                    location=var
+                ))
+        return violations
+
+@dataclass
+class ForbiddenDependencyRule:
+    """No `callers` procedure may start calling a `callees` procedure (calls already present in Old are tolerated)."""
+    rule_id: str
+    callers: NamePattern
+    callees: NamePattern
+    severity: str = "High"
+    message: str = "Procedure '{caller}' depends on forbidden procedure '{callee}'"
+
+    def patterns(self) -> List[Tuple[str, NamePattern]]:
+        return [("procedures", self.callers), ("procedures", self.callees)]
+
+    def evaluate(self, plan: "QueryPlan") -> List[InvariantViolation]:
+        introduced: List[Tuple[str, str]] = [] # (callee, caller)
+        if plan.callers is None:
+            allowed = set(plan.new_procedures(self.callers))
+            existing = set()
+            for callee in plan.old_procedures(self.callees):
+                existing.update((caller, callee) for caller in plan.skm_old.callers_of(callee))
+            for callee in plan.new_procedures(self.callees):
+                for caller in plan.skm_new.callers_of(callee):
+                    if caller in allowed and (caller, callee) not in existing:
+                        introduced.append((callee, caller))
+        else:
+            for caller in plan.callers:
+                if caller not in plan.skm_new.procedures or not self.callers.matches(caller):
+                    continue
+                existing = set()
+                if caller in plan.skm_old.procedures:
+                    existing = plan.targets_called(plan.skm_old, caller, self.callees)
+                for callee in plan.targets_called(plan.skm_new, caller, self.callees) - existing:
+                    introduced.append((callee, caller))
+
+        violations = []
+        for callee, caller in sorted(introduced):
+            violations.append(InvariantViolation(
+                rule_id=self.rule_id,
+                description=self.message.format(caller=caller, callee=callee),
+                severity=self.severity,
+                location=caller
+            ))
+        return violations
+
+Rule = Union[CallPreservationRule, ProtectedWriteRule, ForbiddenDependencyRule]
+
+class QueryPlan:
+    """
+    Name selections shared by a set of rules.
+
+    Full check: every distinct NamePattern used by any rule is evaluated in
+    a single pass over each SKM's procedures and variables; rules then only
+    join the selected names against the SKM indexes.
+
+    Incremental check (dirty_procedures given): only `callers` and
+    `variables` are examined. A procedure's call and write sets change only
+    if its fingerprint does, and a call can only resolve differently if a
+    procedure was added or removed, so the callers in scope are the dirty
+    procedures plus every caller (Old or New) of an added or removed one;
+    the variables in scope are the dirty ones (default: those added or
+    removed) plus everything a dirty procedure writes in either version.
+    """
+    def __init__(self, rules: Iterable[Rule], skm_old: SystemKnowledgeModel, skm_new: SystemKnowledgeModel,
+                 dirty_procedures: Optional[Iterable[str]] = None, dirty_variables: Optional[Iterable[str]] = None):
+        self.skm_old = skm_old
+        self.skm_new = skm_new
+        self.callers: Optional[Set[str]] = None
+        self.variables: Optional[Set[str]] = None
+
+        if dirty_procedures is not None:
+            self.callers = set(dirty_procedures)
+            if dirty_variables is None:
+                self.variables = set(skm_old.variables.keys() ^ skm_new.variables.keys())
+            else:
+                self.variables = set(dirty_variables)
+            for name in list(self.callers):
+                in_old = name in skm_old.procedures
+                in_new = name in skm_new.procedures
+                if in_old:
+                    self.variables.update(skm_old.procedures[name].written_vars)
+                if in_new:
+                    self.variables.update(skm_new.procedures[name].written_vars)
+                if in_old != in_new:
+                    self.callers.update(skm_old.callers_of(name))
+                    self.callers.update(skm_new.callers_of(name))
+            return
+
+        proc_patterns: Set[NamePattern] = set()
+        var_patterns: Set[NamePattern] = set()
+        for rule in rules:
+            for kind, pattern in rule.patterns():
+                (var_patterns if kind == "variables" else proc_patterns).add(pattern)
+
+        self._old_procs = _select(skm_old.procedures, proc_patterns)
+        self._new_procs = _select(skm_new.procedures, proc_patterns)
+        self._old_vars = _select(skm_old.variables, var_patterns)
+
+    # --- Full check selections ---
+
+    def old_procedures(self, pattern: NamePattern) -> List[str]:
+        return self._old_procs[pattern]
+
+    def new_procedures(self, pattern: NamePattern) -> List[str]:
+        return self._new_procs[pattern]
+
+    def old_variables(self, pattern: NamePattern) -> List[str]:
+        return self._old_vars[pattern]
+
+    # --- Per-procedure lookups (incremental check) ---
+
+    @staticmethod
+    def calls_to(skm: SystemKnowledgeModel, caller: str, pattern: NamePattern) -> Set[str]:
+        """Names `caller` calls that resolve to a procedure selected by `pattern`."""
+        return {
+            call for call in skm.procedures[caller].calls
+            if any(pattern.matches(t) for t in skm.resolve_procedure(call))
+        }
+
+    @staticmethod
+    def targets_called(skm: SystemKnowledgeModel, caller: str, pattern: NamePattern) -> Set[str]:
+        """Procedures selected by `pattern` that `caller` calls under any name."""
+        return {
+            t for call in skm.procedures[caller].calls
+            for t in skm.resolve_procedure(call) if pattern.matches(t)
+        }
+
+class RuleEngine:
+    """Evaluates rules over an Old/New SKM pair, timing each rule (seconds, in `timings`)."""
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules: List[Rule] = list(rules)
+        self.timings: Dict[str, float] = {}
+        self.plan_time = 0.0
+
+    def check(self, skm_old: SystemKnowledgeModel, skm_new: SystemKnowledgeModel,
+              dirty_procedures: Optional[Iterable[str]] = None,
+              dirty_variables: Optional[Iterable[str]] = None) -> List[InvariantViolation]:
+        """
+        Full check, or, given dirty_procedures (e.g. SemanticDiffer.changed_procedures),
+        an incremental one that yields the same violations; see QueryPlan.
+        """
+        start = time.perf_counter()
+        plan = QueryPlan(self.rules, skm_old, skm_new, dirty_procedures, dirty_variables)
+        self.plan_time = time.perf_counter() - start
+
+        self.timings = {}
+        violations: List[InvariantViolation] = []
+        for rule in self.rules:
+            start = time.perf_counter()
+            violations.extend(rule.evaluate(plan))
+            self.timings[rule.rule_id] = time.perf_counter() - start
+        return violations
+
+# --- Declarative format ---
+
+_KINDS = {
+    "call_preservation": (CallPreservationRule, ("targets",)),
+    "protected_write": (ProtectedWriteRule, ("variables",)),
+    "forbidden_dependency": (ForbiddenDependencyRule, ("callers", "callees")),
+}
+
+def rule_from_dict(spec: dict) -> Rule:
+    """
+    Builds a rule from its declarative form, e.g.
+    {"id": "INV-01", "kind": "call_preservation", "severity": "High",
+     "targets": {"contains": ["safety", "handler"]}}
+    Patterns take "contains" (list of substrings) and/or "regex".
+    """
+    kind = spec.get("kind")
+    if kind not in _KINDS:
+        raise ValueError(f"Unknown rule kind: {kind!r}")
+    cls, pattern_keys = _KINDS[kind]
+    kwargs = {"rule_id": spec["id"]}
+    for key in pattern_keys:
+        pattern = spec[key]
+        kwargs[key] = NamePattern(tuple(pattern.get("contains", ())), pattern.get("regex"))
+    for key in ("severity", "message"):
+        if key in spec:
+            kwargs[key] = spec[key]
+    return cls(**kwargs)
+
+def load_rules(source: Union[str, dict, list]) -> List[Rule]:
+    """Rules from a JSON file path, a {"rules": [...]} dict or a list of rule dicts."""
+    if isinstance(source, str):
+        with open(source, encoding="utf-8") as f:
+            source = json.load(f)
+    if isinstance(source, dict):
+        source = source.get("rules", [])
+    return [rule_from_dict(spec) for spec in source]
+
+# The two historical invariants.
+DEFAULT_RULES: List[Rule] = [
+    CallPreservationRule(
+        rule_id="INV-01",
+        targets=NamePattern(("safety", "handler", "critical")),
+        severity="High",
+        message="Procedure '{caller}' stopped calling required Safety/Handler procedures. Previously called: {callees}"
+    ),
+    ProtectedWriteRule(
+        rule_id="INV-02",
+        variables=NamePattern(("critical", "state")),
+        severity="Medium",
+        message="Critical variable '{variable}' has new writer(s): {writers}"
+    ),
+]
+
+def _select(names: Iterable[str], patterns: Set[NamePattern]) -> Dict[NamePattern, List[str]]:
+    selected: Dict[NamePattern, List[str]] = {p: [] for p in patterns}
+    if patterns:
+        for name in names:
+            lowered = name.lower()
+            for p in patterns:
+                if p.matches(name, lowered):
+                    selected[p].append(name)
+    return selected
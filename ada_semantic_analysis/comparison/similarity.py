@@ -0,0 +1,126 @@
+import hashlib
+import random
+from collections import defaultdict, deque
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+from ..core.skm import ProcedureInfo
+
+_PRIME = (1 << 61) - 1
+
+def procedure_features(proc: ProcedureInfo) -> FrozenSet[str]:
+    """The set a procedure is compared on: what it calls, reads, writes and its statements."""
+    features = set()
+    features.update("call:" + c for c in proc.calls)
+    features.update("write:" + v for v in proc.written_vars)
+    features.update("read:" + v for v in proc.read_vars)
+    features.update("stmt:" + h for h in proc.statement_hashes)
+    return frozenset(features)
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+class MinHasher:
+    """MinHash signatures using universal hashing over a stable 64-bit feature hash."""
+    def __init__(self, num_perm: int = 32, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._perms = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+    def signature(self, features: Iterable[str]) -> Tuple[int, ...]:
+        hashes = [int.from_bytes(hashlib.blake2b(f.encode(), digest_size=8).digest(), 'little') for f in features]
+        return tuple(min((a * x + b) % _PRIME for x in hashes) for a, b in self._perms)
+
+class SimilarityMatcher:
+    """
+    Fuzzy rename/move matching with MinHash + LSH.
+
+    Each candidate's feature set is MinHashed and its signature split into
+    `bands` bands; candidates sharing any band bucket with a procedure are
+    scored by exact Jaccard similarity and the best one at or above
+    `threshold` wins (ties: same parent package, then candidate order).
+    Byte-for-byte identical feature sets are matched through an exact index
+    first, and buckets larger than `max_bucket` are ignored, so large
+    families of look-alike procedures cannot make matching quadratic.
+    Every index is keyed by the interface (inputs/outputs) too: a body that
+    looks alike behind a different signature is not a rename.
+    """
+    def __init__(self, candidates: Iterable[Tuple[str, ProcedureInfo]], threshold: float = 0.8,
+                 num_perm: int = 32, bands: int = 8, max_bucket: int = 64):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.max_bucket = max_bucket
+        self._rows = num_perm // bands
+        self._hasher = MinHasher(num_perm)
+
+        self._order: Dict[str, int] = {}
+        self._features: Dict[str, FrozenSet[str]] = {}
+        self._exact = defaultdict(deque) # (interface, feature set) -> names
+        self._exact_scoped = defaultdict(deque) # (interface, feature set, parent) -> names
+        self._bands = defaultdict(list) # (interface, band, rows) -> names
+        self._taken = set()
+
+        for name, proc in candidates:
+            features = procedure_features(proc)
+            if not features:
+                continue # Nothing to compare on; left to the signature rule
+            interface = _interface(proc)
+            self._order[name] = len(self._order)
+            self._features[name] = features
+            self._exact[(interface, features)].append(name)
+            self._exact_scoped[(interface, features, _parent(name))].append(name)
+            for key in self._band_keys(interface, features):
+                self._bands[key].append(name)
+
+    def match(self, name: str, proc: ProcedureInfo) -> Optional[Tuple[str, float]]:
+        """Returns (candidate, jaccard) for the best untaken candidate, marking it taken."""
+        features = procedure_features(proc)
+        if not features:
+            return None
+
+        interface = _interface(proc)
+        parent = _parent(name)
+        best = (self._head(self._exact_scoped.get((interface, features, parent)))
+                or self._head(self._exact.get((interface, features))))
+        if best is not None:
+            self._taken.add(best)
+            return best, 1.0
+
+        best_key = None
+        seen = set()
+        for key in self._band_keys(interface, features):
+            bucket = self._bands.get(key)
+            if not bucket or len(bucket) > self.max_bucket:
+                continue
+            for cand in bucket:
+                if cand in seen or cand in self._taken:
+                    continue
+                seen.add(cand)
+                score = jaccard(features, self._features[cand])
+                if score < self.threshold:
+                    continue
+                rank = (score, _parent(cand) == parent, -self._order[cand])
+                if best_key is None or rank > best_key:
+                    best, best_key = cand, rank
+
+        if best is None:
+            return None
+        self._taken.add(best)
+        return best, best_key[0]
+
+    def _band_keys(self, interface, features) -> List[Tuple]:
+        sig = self._hasher.signature(features)
+        r = self._rows
+        return [(interface, i, sig[i * r:(i + 1) * r]) for i in range(len(sig) // r)]
+
+    def _head(self, bucket) -> Optional[str]:
+        while bucket and bucket[0] in self._taken:
+            bucket.popleft()
+        return bucket[0] if bucket else None
+
+def _parent(name: str) -> str:
+    return name.rpartition('.')[0]
+
+def _interface(proc: ProcedureInfo) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    return tuple(sorted(proc.inputs)), tuple(sorted(proc.outputs))
@@ -1,17 +1,153 @@
-from dataclasses import dataclass, field
-from typing import List, Optional, Union
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple, Union, get_args, get_type_hints
 
-@dataclass
+class TokenSpan:
+    """
+    Source text kept as a reference to tokens [start, end) of the parser's
+    token store (a token list or a TokenBuffer). The text, each token value
+    followed by a space after an optional `prefix`, is built on first use
+    and cached; the token store is released then. Compares, hashes and
+    pickles as that text.
+    """
+    __slots__ = ('_tokens', 'start', 'end', 'prefix', '_text')
+
+    def __init__(self, tokens, start: int, end: int, prefix: str = ""):
+        self._tokens = tokens
+        self.start = start
+        self.end = end
+        self.prefix = prefix
+        self._text: Optional[str] = None
+
+    def __str__(self) -> str:
+        if self._text is None:
+            tokens = self._tokens
+            if isinstance(tokens, list):
+                values = [t.value for t in tokens[self.start:self.end]]
+            else:
+                values = [tokens.value(i) for i in range(self.start, self.end)]
+            self._text = self.prefix + "".join(v + " " for v in values)
+            self._tokens = None
+        return self._text
+
+    def __repr__(self) -> str:
+        return repr(str(self))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (str, TokenSpan)):
+            return str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __len__(self) -> int:
+        return len(str(self))
+
+    def __contains__(self, item: str) -> bool:
+        return item in str(self)
+
+    def __reduce__(self):
+        return (str, (str(self),))
+
+# Expression text: a plain string or a lazily joined TokenSpan
+Text = Union[str, TokenSpan]
+
+class LazyStatements:
+    """
+    The statements of a subprogram body, kept as tokens [start, end) of a
+    TokenBuffer (`end` is the END closing the body) and parsed on first
+    use by `parse(source, start, end, line_delta)`. `line` is the line of the
+    first token and span_hash a digest of the span's source text, so an
+    unchanged body can be recognized without parsing it (see SKMBuilder).
+
+    Iterates and compares as the parsed list, and node_hash digests it as
+    that list. Pickles
+    unparsed as the span's text, which parse() lexes again; once parsed,
+    as the list.
+    """
+    __slots__ = ('_parse', '_source', 'start', 'end', 'line', 'span_hash', '_line_delta', '_statements', 'digests')
+
+    def __init__(self, parse: Callable, source, start: int, end: Optional[int], line: int,
+                 span_hash: str, line_delta: int = 0):
+        self._parse = parse
+        self._source = source # a TokenBuffer, or the span's text
+        self.start = start
+        self.end = end
+        self.line = line
+        self.span_hash = span_hash
+        self._line_delta = line_delta # added to the parsed lines
+        self._statements: Optional[List['ASTNode']] = None
+        # node_hash digests of the statements, when known without parsing them
+        self.digests: Optional[List[bytes]] = None
+
+    @property
+    def expanded(self) -> bool:
+        return self._statements is not None
+
+    @property
+    def statements(self) -> List['ASTNode']:
+        if self._statements is None:
+            self._statements = self._parse(self._source, self.start, self.end, self._line_delta)
+            self._source = None
+        return self._statements
+
+    def shift(self, delta: int):
+        """Moves the lines of the unparsed statements by `delta`."""
+        self.line += delta
+        self._line_delta += delta
+
+    def text(self) -> str:
+        """Source text of the span, the closing END included."""
+        if isinstance(self._source, str):
+            return self._source
+        tokens = self._source
+        return tokens.text(tokens.starts[self.start], tokens.ends[self.end])
+
+    def __iter__(self):
+        return iter(self.statements)
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def __getitem__(self, i):
+        return self.statements[i]
+
+    def __repr__(self) -> str:
+        return repr(self.statements)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, LazyStatements):
+            other = other.statements
+        if isinstance(other, list):
+            return self.statements == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __reduce__(self):
+        if self._statements is not None:
+            return (list, (self._statements,))
+        # The text is lexed from line 1
+        line_delta = self._line_delta if isinstance(self._source, str) else self._line_delta + self.line - 1
+        return (LazyStatements, (self._parse, self.text(), 0, None, self.line, self.span_hash, line_delta))
+
+@dataclass(slots=True)
 class ASTNode:
-    """Base class for all AST nodes."""
+    """
+    Base class for all AST nodes. Nodes are slotted: no per-instance
+    __dict__. child_fields() lists the fields that hold child nodes.
+    """
     line: int = field(default=0, kw_only=True)
+    # Memoized Merkle digest, see structural_hash.node_hash
+    struct_hash: Optional[bytes] = field(default=None, kw_only=True, repr=False, compare=False)
 
-@dataclass
+@dataclass(slots=True)
 class CompilationUnitNode(ASTNode):
     """Represents a full file parsing unit."""
     files: List['PackageNode'] = field(default_factory=list)
 
-@dataclass
+@dataclass(slots=True)
 class PackageNode(ASTNode):
     """Represents a package specification or body."""
     name: str
@@ -19,7 +155,7 @@ class PackageNode(ASTNode):
     declarations: List[ASTNode] = field(default_factory=list)
     body: Optional[List[ASTNode]] = None # For package bodies that contain statements/procedures
 
-@dataclass
+@dataclass(slots=True)
 class SubprogramNode(ASTNode):
     """Represents a procedure or function."""
     name: str
@@ -27,64 +163,75 @@ class SubprogramNode(ASTNode):
     parameters: List['ParameterNode'] = field(default_factory=list)
     return_type: Optional[str] = None
     declarations: List[ASTNode] = field(default_factory=list)
-    statements: List[ASTNode] = field(default_factory=list)
+    statements: List[ASTNode] = field(default_factory=list) # or LazyStatements, see AdaParser
     is_body: bool = True
 
-@dataclass
+@dataclass(slots=True)
 class ParameterNode(ASTNode):
     name: str
     mode: str # "in", "out", "in out"
     type_name: str
 
-@dataclass
+@dataclass(slots=True)
 class VariableDeclNode(ASTNode):
     names: List[str]
     type_name: str
-    initial_value: Optional[str] = None
+    initial_value: Optional[Text] = None
 
-@dataclass
+@dataclass(slots=True)
 class TypeDeclNode(ASTNode):
     name: str
-    type_def: str
+    type_def: Text
 
-@dataclass
+@dataclass(slots=True)
 class IfNode(ASTNode):
-    condition: str
+    condition: Text
     then_block: List[ASTNode]
     elsif_parts: List['ElsifNode'] = field(default_factory=list)
     else_block: Optional[List[ASTNode]] = None
 
-@dataclass
+@dataclass(slots=True)
 class ElsifNode(ASTNode):
-    condition: str
+    condition: Text
     statements: List[ASTNode]
 
-@dataclass
+@dataclass(slots=True)
 class LoopNode(ASTNode):
     name: Optional[str]
-    iteration_scheme: Optional[str] # "while ...", "for ..."
+    iteration_scheme: Optional[Text] # "while ...", "for ..."
     statements: List[ASTNode]
 
-@dataclass
+@dataclass(slots=True)
 class CallNode(ASTNode):
     name: str
     arguments: List[str]
 
-@dataclass
+@dataclass(slots=True)
 class AssignmentNode(ASTNode):
     target: str
-    expression: str
+    expression: Text
 
-@dataclass
+@dataclass(slots=True)
 class ReturnNode(ASTNode):
-    expression: Optional[str] = None
+    expression: Optional[Text] = None
 
-@dataclass
+@dataclass(slots=True)
 class WhenNode(ASTNode):
-    choices: str # "Idle | Active"
+    choices: Text # "Idle | Active"
     statements: List[ASTNode]
 
-@dataclass
+@dataclass(slots=True)
 class CaseNode(ASTNode):
-    expression: str
+    expression: Text
     when_parts: List[WhenNode]
+
+@lru_cache(maxsize=None)
+def child_fields(cls) -> Tuple[str, ...]:
+    """Fields of node class `cls` typed to hold a node or a list of nodes, in declaration order."""
+    hints = get_type_hints(cls)
+    return tuple(f.name for f in fields(cls) if _holds_nodes(hints[f.name]))
+
+def _holds_nodes(hint) -> bool:
+    if isinstance(hint, type):
+        return issubclass(hint, ASTNode)
+    return any(_holds_nodes(arg) for arg in get_args(hint))
@@ -0,0 +1,185 @@
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+import networkx as nx
+
+class CompactCallGraph:
+    """
+    Array-backed call graph.
+
+    Nodes are interned to integer ids. Call sites are appended to flat
+    arrays (caller id, callee id, line) and compiled on first query into
+    CSR form: forward and reverse adjacency over unique edges, with the
+    call-site lines of each edge in a parallel array. Any mutation drops
+    the compiled form, which is rebuilt lazily.
+
+    Use to_networkx() when a networkx.DiGraph is needed.
+    """
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._kinds: Dict[int, str] = {} # node id -> "procedure" etc.
+        self._site_src = array('I')
+        self._site_dst = array('I')
+        self._site_line = array('i')
+        self._csr = None
+        self._nx: Optional[nx.DiGraph] = None
+
+    # --- Building ---
+
+    def add_node(self, name: str, kind: Optional[str] = None) -> int:
+        i = self._ids.get(name)
+        if i is None:
+            i = len(self._names)
+            self._ids[name] = i
+            self._names.append(name)
+            self._invalidate()
+        if kind is not None and self._kinds.get(i) != kind:
+            self._kinds[i] = kind
+            self._nx = None
+        return i
+
+    def add_call(self, caller: str, callee: str, line: int = 0):
+        """Records one call site."""
+        self._site_src.append(self.add_node(caller))
+        self._site_dst.append(self.add_node(callee))
+        self._site_line.append(line)
+        self._invalidate()
+
+    def _invalidate(self):
+        self._csr = None
+        self._nx = None
+
+    # --- Compiled form ---
+
+    def freeze(self):
+        """Compiles pending call sites into CSR arrays (done lazily by every query)."""
+        if self._csr is not None:
+            return
+        n = len(self._names)
+        # Sites grouped by (caller, callee), keeping call order within a group.
+        order = sorted(range(len(self._site_src)), key=lambda k: (self._site_src[k], self._site_dst[k]))
+
+        fwd_offsets = array('I', [0] * (n + 1))
+        fwd_targets = array('I')
+        line_offsets = array('I', [0])
+        lines = array('i')
+        prev = None
+        for k in order:
+            edge = (self._site_src[k], self._site_dst[k])
+            if edge != prev:
+                if prev is not None:
+                    line_offsets.append(len(lines))
+                fwd_targets.append(edge[1])
+                fwd_offsets[edge[0] + 1] += 1
+                prev = edge
+            lines.append(self._site_line[k])
+        if prev is not None:
+            line_offsets.append(len(lines))
+        for i in range(n):
+            fwd_offsets[i + 1] += fwd_offsets[i]
+
+        rev_offsets = array('I', [0] * (n + 1))
+        for t in fwd_targets:
+            rev_offsets[t + 1] += 1
+        for i in range(n):
+            rev_offsets[i + 1] += rev_offsets[i]
+        rev_sources = array('I', [0] * len(fwd_targets))
+        fill = array('I', rev_offsets[:n])
+        for src in range(n):
+            for e in range(fwd_offsets[src], fwd_offsets[src + 1]):
+                t = fwd_targets[e]
+                rev_sources[fill[t]] = src
+                fill[t] += 1
+
+        self._csr = (fwd_offsets, fwd_targets, line_offsets, lines, rev_offsets, rev_sources)
+
+    def number_of_nodes(self) -> int:
+        return len(self._names)
+
+    def number_of_edges(self) -> int:
+        self.freeze()
+        return len(self._csr[1])
+
+    def id_of(self, name: str) -> Optional[int]:
+        return self._ids.get(name)
+
+    def name_of(self, i: int) -> str:
+        return self._names[i]
+
+    def successor_ids(self, i: int):
+        self.freeze()
+        fwd_offsets, fwd_targets = self._csr[0], self._csr[1]
+        return fwd_targets[fwd_offsets[i]:fwd_offsets[i + 1]]
+
+    def predecessor_ids(self, i: int):
+        self.freeze()
+        rev_offsets, rev_sources = self._csr[4], self._csr[5]
+        return rev_sources[rev_offsets[i]:rev_offsets[i + 1]]
+
+    # --- Name-level queries (networkx-like) ---
+
+    @property
+    def nodes(self) -> List[str]:
+        return list(self._names)
+
+    @property
+    def edges(self) -> Iterator[Tuple[str, str]]:
+        self.freeze()
+        fwd_offsets, fwd_targets = self._csr[0], self._csr[1]
+        for src in range(len(self._names)):
+            for e in range(fwd_offsets[src], fwd_offsets[src + 1]):
+                yield self._names[src], self._names[fwd_targets[e]]
+
+    def has_node(self, name: str) -> bool:
+        return name in self._ids
+
+    def has_edge(self, caller: str, callee: str) -> bool:
+        return self._edge_index(caller, callee) is not None
+
+    def successors(self, name: str) -> List[str]:
+        i = self._ids.get(name)
+        return [] if i is None else [self._names[t] for t in self.successor_ids(i)]
+
+    def predecessors(self, name: str) -> List[str]:
+        i = self._ids.get(name)
+        return [] if i is None else [self._names[s] for s in self.predecessor_ids(i)]
+
+    def edge_lines(self, caller: str, callee: str) -> List[int]:
+        """Call-site lines of caller -> callee, in call order ([] if no such edge)."""
+        e = self._edge_index(caller, callee)
+        if e is None:
+            return []
+        line_offsets, lines = self._csr[2], self._csr[3]
+        return list(lines[line_offsets[e]:line_offsets[e + 1]])
+
+    def _edge_index(self, caller: str, callee: str) -> Optional[int]:
+        src, dst = self._ids.get(caller), self._ids.get(callee)
+        if src is None or dst is None:
+            return None
+        self.freeze()
+        fwd_offsets, fwd_targets = self._csr[0], self._csr[1]
+        # Targets of a node are sorted by id: binary search.
+        lo, hi = fwd_offsets[src], fwd_offsets[src + 1]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if fwd_targets[mid] < dst:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < fwd_offsets[src + 1] and fwd_targets[lo] == dst:
+            return lo
+        return None
+
+    def to_networkx(self) -> nx.DiGraph:
+        """networkx view with the same nodes, 'type' node and 'lines' edge attributes. Cached until mutated."""
+        if self._nx is None:
+            g = nx.DiGraph()
+            for i, name in enumerate(self._names):
+                if i in self._kinds:
+                    g.add_node(name, type=self._kinds[i])
+                else:
+                    g.add_node(name)
+            for caller, callee in self.edges:
+                g.add_edge(caller, callee, lines=self.edge_lines(caller, callee))
+            self._nx = g
+        return self._nx
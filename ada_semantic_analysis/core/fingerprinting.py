@@ -6,6 +6,19 @@ class BehavioralFingerprint:
     def __init__(self, proc_info: ProcedureInfo):
         self.proc_info = proc_info
         self.fingerprint = self._generate()
+        self._hash = None
+
+    @classmethod
+    def of(cls, proc_info: ProcedureInfo) -> 'BehavioralFingerprint':
+        """
+        Returns the fingerprint memoized on proc_info, generating it on first use.
+        The SKM drops the memo whenever it mutates the procedure.
+        """
+        fp = proc_info.fingerprint_cache
+        if fp is None:
+            fp = cls(proc_info)
+            proc_info.fingerprint_cache = fp
+        return fp
 
     def _generate(self) -> dict:
         """
@@ -30,8 +43,10 @@ class BehavioralFingerprint:
     @property
     def hash(self) -> str:
         """Returns a SHA256 hash of the fingerprint."""
-        data = json.dumps(self.fingerprint, sort_keys=True)
-        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+        if self._hash is None:
+            data = json.dumps(self.fingerprint, sort_keys=True)
+            self._hash = hashlib.sha256(data.encode('utf-8')).hexdigest()
+        return self._hash
 
 class FingerprintGenerator:
     def __init__(self, skm: SystemKnowledgeModel):
@@ -43,7 +58,7 @@ class FingerprintGenerator:
         """
         results = {}
         for name, proc in self.skm.procedures.items():
-            bf = BehavioralFingerprint(proc)
+            bf = BehavioralFingerprint.of(proc)
             results[name] = {
                 "hash": bf.hash,
                 "details": bf.fingerprint
@@ -0,0 +1,89 @@
+from typing import List, Optional, Tuple
+
+from .lexer import AdaLexer, TokenBuffer
+from .parser import AdaParser
+from .ast_nodes import ASTNode, CompilationUnitNode
+
+def text_edit(old: str, new: str) -> Tuple[int, int, int]:
+    """
+    The single edit turning `old` into `new`, as (start, old_end, new_end):
+    old[start:old_end] was replaced by new[start:new_end].
+    """
+    block = 4096
+    n = min(len(old), len(new))
+    start = 0
+    while start + block <= n and old[start:start + block] == new[start:start + block]:
+        start += block
+    while start < n and old[start] == new[start]:
+        start += 1
+
+    tail = 0
+    limit = n - start
+    while tail + block <= limit and old[len(old) - tail - block:len(old) - tail] == new[len(new) - tail - block:len(new) - tail]:
+        tail += block
+    while tail < limit and old[len(old) - tail - 1] == new[len(new) - tail - 1]:
+        tail += 1
+    return start, len(old) - tail, len(new) - tail
+
+class IncrementalDocument:
+    """
+    A source file kept parsed across edits.
+
+    edit()/update() re-lex only the tokens around the edited text (see
+    AdaLexer.relex) and re-parse only the subprograms and packages those
+    tokens belong to (see AdaParser.reparse_compilation_unit). The others
+    are carried over from the previous parse with their memoized structural
+    hashes, so unchanged procedures are not re-hashed either.
+
+    The previous unit is consumed by an edit: subtrees carried over are
+    moved into the new unit and their line numbers shifted in place.
+    """
+    def __init__(self, source: str, backend: str = "regex", token_budget: Optional[int] = None,
+                 time_budget: Optional[float] = None):
+        self.backend = backend
+        # Per-parse budgets, see AdaParser
+        self.budgets = {"token_budget": token_budget, "time_budget": time_budget}
+        self.source = source
+        self.tokens: Optional[TokenBuffer] = None
+        self.unit: Optional[CompilationUnitNode] = None
+        self.item_spans: List[Tuple[int, int, ASTNode]] = [] # see AdaParser.item_spans
+        self.relexed = 0 # tokens scanned again by the last edit
+        self.reparsed = 0 # subprograms and packages parsed again by the last edit
+        self._parse(AdaLexer(source, backend=backend))
+
+    def update(self, source: str) -> CompilationUnitNode:
+        """Brings the document to a new version of the whole text."""
+        if source == self.source and self.unit is not None:
+            self.relexed = self.reparsed = 0
+            return self.unit
+        start, old_end, new_end = text_edit(self.source, source)
+        return self.edit(start, old_end, source[start:new_end])
+
+    def edit(self, start: int, old_end: int, text: str) -> CompilationUnitNode:
+        """Replaces source[start:old_end] by `text` and returns the new unit."""
+        source = self.source[:start] + text + self.source[old_end:]
+        lexer = AdaLexer(source, backend=self.backend)
+        if self.unit is None:
+            # The previous version did not parse: nothing to reuse.
+            self.source = source
+            return self._parse(lexer)
+
+        tokens, damage = lexer.relex(self.tokens, start, old_end, start + len(text))
+        parser = AdaParser(lexer, tokens=tokens, **self.budgets)
+        previous_spans, previous_tokens = self.item_spans, self.tokens
+        self.source, self.tokens, self.unit, self.item_spans = source, tokens, None, []
+        self.relexed = damage.new_end - damage.start
+        unit = parser.reparse_compilation_unit(previous_spans, previous_tokens, damage)
+        reused = {id(node) for _, _, node in previous_spans}
+        self.reparsed = sum(1 for _, _, node in parser.item_spans if id(node) not in reused)
+        self.unit, self.item_spans = unit, parser.item_spans
+        return unit
+
+    def _parse(self, lexer: AdaLexer) -> CompilationUnitNode:
+        self.tokens, self.unit, self.item_spans = lexer.tokenize_compact(), None, []
+        self.relexed = len(self.tokens)
+        parser = AdaParser(lexer, tokens=self.tokens, **self.budgets)
+        unit = parser.parse_compilation_unit()
+        self.reparsed = len(parser.item_spans)
+        self.unit, self.item_spans = unit, parser.item_spans
+        return unit
@@ -0,0 +1,244 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .lexer import AdaLexer
+from .parser import AdaParser
+from .ast_nodes import CompilationUnitNode
+from .skm import SystemKnowledgeModel
+from .skm_builder import SKMBuilder
+from .parse_cache import ParseCache
+from .incremental import IncrementalDocument
+
+ADA_EXTENSIONS = ('.adb', '.ads', '.ada')
+
+# Files at least this large are lexed straight from a memory map into a
+# compact token buffer (AdaLexer.from_file) instead of being decoded first.
+MMAP_THRESHOLD = 4 * 1024 * 1024
+
+def collect_sources(path: str, extensions: Sequence[str] = ADA_EXTENSIONS) -> List[str]:
+    """
+    Returns every Ada source file below `path` in a stable order.
+    Directories and files are visited sorted so that the merge order
+    does not depend on the filesystem.
+    """
+    sources = []
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for f in sorted(files):
+            if f.lower().endswith(tuple(extensions)):
+                sources.append(os.path.join(root, f))
+    return sources
+
+def file_digest(path: str) -> Optional[str]:
+    """SHA-256 of the raw file bytes, or None if the file cannot be read."""
+    try:
+        with open(path, 'rb') as fh:
+            return hashlib.sha256(fh.read()).hexdigest()
+    except OSError:
+        return None
+
+def parse_source(path: str, token_budget: Optional[int] = None, time_budget: Optional[float] = None,
+                 lazy_bodies: bool = False) -> Tuple[str, Optional[CompilationUnitNode], Optional[str]]:
+    """
+    Lexes and parses a single file. Runs inside pool workers, so it never
+    raises: failures, including an exceeded parse budget (see AdaParser),
+    are returned as an error string instead.
+    """
+    try:
+        if os.path.getsize(path) >= MMAP_THRESHOLD:
+            # The map is closed once the unit is built; see AdaLexer.close()
+            with AdaLexer.from_file(path) as lexer:
+                parser = AdaParser(lexer, compact=True, token_budget=token_budget,
+                                   time_budget=time_budget, lazy_bodies=lazy_bodies)
+                unit = parser.parse_compilation_unit()
+        else:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as fh:
+                code = fh.read()
+            lexer = AdaLexer(code)
+            parser = AdaParser(lexer, token_budget=token_budget, time_budget=time_budget,
+                               lazy_bodies=lazy_bodies)
+            unit = parser.parse_compilation_unit()
+        return path, unit, None
+    except Exception as e:
+        return path, None, str(e)
+
+class ParallelIngestor:
+    """
+    Parses source trees into SystemKnowledgeModels using a process pool.
+
+    Lexing and parsing are spread across `max_workers` processes with the
+    largest files scheduled first. The SKM itself is always built in the
+    calling process, in `collect_sources` order, so the result is identical
+    to a serial run.
+
+    Files are deduplicated by a hash of their raw bytes before parsing:
+    byte-identical files (typically the same file in both versions of a
+    comparison) are parsed once and the unit is shared. With a ParseCache,
+    files whose bytes were parsed before (by any run) are loaded from the
+    cache and never reach the pool.
+
+    With a `documents` dict (kept by the caller across runs), the few files
+    left to parse in-process are parsed through an IncrementalDocument per
+    path, so a file edited between runs is re-parsed only around the edit.
+
+    token_budget and time_budget bound the parse of each file; a file that
+    exceeds them is reported in `errors` and skipped.
+
+    With lazy_bodies, subprogram statements are parsed only when the SKM
+    is built (see AdaParser), and each tree after the first is built
+    against the previous one as baseline: bodies whose text did not change
+    are taken from the baseline's summaries without being parsed (see
+    SKMBuilder). A body that does not parse then fails the SKM build of
+    its file rather than its parse. IncrementalDocuments parse eagerly.
+    """
+    # Below this many files the pool start-up costs more than it saves.
+    MIN_PARALLEL_FILES = 4
+
+    def __init__(self, max_workers: Optional[int] = None, extensions: Sequence[str] = ADA_EXTENSIONS, cache: Optional[ParseCache] = None,
+                 documents: Optional[Dict[str, IncrementalDocument]] = None,
+                 token_budget: Optional[int] = None, time_budget: Optional[float] = None,
+                 lazy_bodies: bool = False):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.extensions = tuple(extensions)
+        self.cache = cache
+        self.documents = documents # path -> IncrementalDocument
+        self.budgets = {"token_budget": token_budget, "time_budget": time_budget}
+        self.lazy_bodies = lazy_bodies
+        self.errors: List[Tuple[str, str]] = [] # (path, message)
+        self.digests: Dict[str, Optional[str]] = {} # path -> raw bytes hash
+        self.contributions: Dict[str, Set[str]] = {} # path -> procedures it added
+
+    def parse_files(self, paths: Sequence[str]) -> Dict[str, Optional[CompilationUnitNode]]:
+        """Parses `paths` and returns the compilation unit for each (None on failure)."""
+        # Hash pass: one representative path per distinct file content.
+        representatives = {}
+        for path in dict.fromkeys(paths):
+            if path not in self.digests:
+                self.digests[path] = file_digest(path)
+            representatives.setdefault(self.digests[path] or path, path)
+
+        units = {}
+        pending = []
+        for digest, path in representatives.items():
+            if self.cache is not None and self.digests[path]:
+                unit = self.cache.get(self.cache.key_for_digest(digest))
+                if unit is not None:
+                    units[path] = unit
+                    continue
+            pending.append(path)
+
+        parsed = self._parse_uncached(pending)
+        if self.cache is not None:
+            for path, unit in parsed.items():
+                if unit is not None and self.digests[path]:
+                    self.cache.put(self.cache.key_for_digest(self.digests[path]), unit)
+        units.update(parsed)
+
+        return {path: units.get(representatives[self.digests[path] or path]) for path in paths}
+
+    def _parse_uncached(self, paths: Sequence[str]) -> Dict[str, Optional[CompilationUnitNode]]:
+        # Largest first: keeps the long tail off the end of the schedule.
+        schedule = sorted(paths, key=self._file_size, reverse=True)
+
+        parse = partial(parse_source, lazy_bodies=self.lazy_bodies, **self.budgets)
+        if self.max_workers <= 1 or len(schedule) < self.MIN_PARALLEL_FILES:
+            if self.documents is not None:
+                parse = self._parse_document
+            results = map(parse, schedule)
+            return self._collect(results)
+
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, len(schedule))) as pool:
+            return self._collect(pool.map(parse, schedule))
+
+    def _parse_document(self, path: str) -> Tuple[str, Optional[CompilationUnitNode], Optional[str]]:
+        """parse_source() through the path's IncrementalDocument, created on first use."""
+        try:
+            if os.path.getsize(path) >= MMAP_THRESHOLD:
+                return parse_source(path, lazy_bodies=self.lazy_bodies, **self.budgets)
+            with open(path, 'r', encoding='utf-8', errors='ignore') as fh:
+                code = fh.read()
+            document = self.documents.get(path)
+            if document is None:
+                document = IncrementalDocument(code, **self.budgets)
+                self.documents[path] = document
+                return path, document.unit, None
+            return path, document.update(code), None
+        except Exception as e:
+            return path, None, str(e)
+
+    def ingest(self, path: str, name: str) -> SystemKnowledgeModel:
+        return self.ingest_all([(path, name)])[0]
+
+    def ingest_all(self, trees: Sequence[Tuple[str, str]]) -> List[SystemKnowledgeModel]:
+        """
+        Ingests several (path, name) trees through one shared pool, so both
+        versions of a comparison are parsed concurrently.
+        """
+        sources = [collect_sources(path, self.extensions) for path, _ in trees]
+        units = self.parse_files([p for tree in sources for p in tree])
+
+        models = []
+        for (_, name), paths in zip(trees, sources):
+            skm = SystemKnowledgeModel(name)
+            builder = SKMBuilder(skm, baseline=models[-1] if models else None)
+            for path in paths:
+                unit = units.get(path)
+                if unit is None:
+                    continue
+                try:
+                    self.contributions[path] = builder.build(unit)
+                except Exception as e:
+                    self._report(path, str(e))
+            models.append(skm)
+        return models
+
+    def ingest_pair(self, old_path: str, new_path: str, names: Tuple[str, str] = ("Baseline", "Modified")):
+        """
+        Ingests the two versions of a comparison.
+
+        Returns (skm_old, skm_new, unchanged) where `unchanged` holds the
+        procedures contributed only by files that are byte-identical at the
+        same relative path in both trees. Their fingerprints cannot differ,
+        so SemanticDiffer can skip comparing them.
+        """
+        skm_old, skm_new = self.ingest_all([(old_path, names[0]), (new_path, names[1])])
+
+        old_files = {os.path.relpath(p, old_path): p for p in collect_sources(old_path, self.extensions)}
+        new_files = {os.path.relpath(p, new_path): p for p in collect_sources(new_path, self.extensions)}
+
+        unchanged_paths = set()
+        for rel, p_old in old_files.items():
+            p_new = new_files.get(rel)
+            if p_new and self.digests.get(p_old) and self.digests[p_old] == self.digests.get(p_new):
+                unchanged_paths.update((p_old, p_new))
+
+        # A procedure merged from several files is only unchanged if none of
+        # its contributing files changed.
+        unchanged, touched = set(), set()
+        for path in list(old_files.values()) + list(new_files.values()):
+            target = unchanged if path in unchanged_paths else touched
+            target.update(self.contributions.get(path, ()))
+
+        return skm_old, skm_new, unchanged - touched
+
+    def _collect(self, results) -> Dict[str, Optional[CompilationUnitNode]]:
+        units = {}
+        for path, unit, error in results:
+            if error is not None:
+                self._report(path, error)
+            units[path] = unit
+        return units
+
+    def _report(self, path: str, message: str):
+        self.errors.append((path, message))
+        print(f"Error parsing {os.path.basename(path)}: {message}")
+
+    @staticmethod
+    def _file_size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
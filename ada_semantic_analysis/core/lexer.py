@@ -1,5 +1,10 @@
+import mmap
 import re
-from typing import NamedTuple, Iterator, List
+import weakref
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import Dict, Iterable, NamedTuple, Iterator, List, Optional, Tuple, Union
 
 class token(NamedTuple):
     type: str
@@ -7,6 +12,12 @@ class token(NamedTuple):
     line: int
     column: int
 
+class TokenEdit(NamedTuple):
+    """Tokens [start, old_end) of a previous TokenBuffer were replaced by [start, new_end) of the new one."""
+    start: int
+    old_end: int
+    new_end: int
+
 class AdaLexer:
     """
     A deterministic regex-based tokenizer for ADA.
@@ -52,55 +63,542 @@ class AdaLexer:
         ('LT',        r'<'),
         ('PIPE',      r'\|'),
         ('ID',        r'[A-Za-z][A-Za-z0-9_]*'), # Identifiers
-        ('NEWLINE',   r'\n'),             # Line endings
-        ('SKIP',      r'[ \t\r]+'),       # Skip over spaces and tabs
+        ('SKIP',      r'[ \t\r\n]+'),     # Skip over whitespace and line endings
         ('MISMATCH',  r'.'),              # Any other character
     ]
 
-    def __init__(self, source_code: str):
+    _compiled = None # TOKEN_SPEC alternation, see _scanner()
+    _compiled_bytes = None
+
+    # Every token type the lexer emits, in a fixed order (TokenBuffer kind ids)
+    TOKEN_KINDS = (
+        tuple(name for name, _ in TOKEN_SPEC if name not in ('SKIP', 'COMMENT', 'MISMATCH'))
+        + tuple(sorted(k.upper() for k in KEYWORDS))
+        + ('EOF',)
+    )
+
+    # Scanner backends: "regex" matches the TOKEN_SPEC alternation,
+    # "table" dispatches on the first character (see _scan_table).
+    BACKENDS = ("regex", "table")
+
+    def __init__(self, source_code: Union[str, bytes, mmap.mmap], backend: str = "regex"):
+        # A bytes-like source (e.g. from_file) is scanned with a bytes regex
+        # and token text is decoded only when read; see tokenize_compact.
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown lexer backend: {backend!r}")
         self.source_code = source_code
+        self.is_bytes = not isinstance(source_code, str)
+        self.backend = backend
         self.tokens = []
         self.current_token_idx = 0
+        self._mapped_buffers = weakref.WeakSet() # TokenBuffers over a mapped source, see close()
+
+    @classmethod
+    def from_file(cls, path: str, backend: str = "regex") -> 'AdaLexer':
+        """
+        Lexer over a read-only memory map of the file, without reading or
+        decoding it up front. close() it (or use it as a context manager)
+        once parsing is done.
+        """
+        with open(path, 'rb') as fh:
+            try:
+                source = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                source = b"" # empty file
+        return cls(source, backend=backend)
+
+    def close(self):
+        """
+        Closes a memory-mapped source. The TokenBuffers lexed from it, and
+        the spans and lazy bodies over them, are moved to a bytes copy of
+        the source, so they outlive the map.
+        """
+        source = self.source_code
+        if not isinstance(source, mmap.mmap) or source.closed:
+            return
+        data = source[:]
+        for buf in self._mapped_buffers:
+            buf.source = data
+        self._mapped_buffers.clear()
+        self.source_code = data
+        source.close()
+
+    def __enter__(self) -> 'AdaLexer':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _buffer(self) -> 'TokenBuffer':
+        buf = TokenBuffer(self.source_code, self.TOKEN_KINDS)
+        if isinstance(self.source_code, mmap.mmap):
+            self._mapped_buffers.add(buf)
+        return buf
 
     def tokenize(self) -> List[token]:
         """
         Tokenizes the input source code.
         """
-        tok_regex = '|'.join('(?P<%s>%s)' % pair for pair in self.TOKEN_SPEC)
-        get_token = re.compile(tok_regex).match
+        self.tokens = list(self.iter_tokens())
+        return self.tokens
+
+    def iter_tokens(self) -> Iterator[token]:
+        """
+        Yields the tokens of the source code one at a time, ending with EOF.
+
+        Line endings are not tokens: lines and columns come from a table of
+        newline offsets built once per source. A newline inside a string
+        literal is not a line break.
+        """
+        if self.is_bytes:
+            yield from self.tokenize_compact()
+            return
+        source = self.source_code
+        newlines = _newline_offsets(source)
+        n_newlines = len(newlines)
+        k = 0 # newlines[:k] are behind the scan position
         line_num = 1
         line_start = 0
-        mo = get_token(self.source_code)
         
-        self.tokens = []
-        
-        while mo is not None:
-            kind = mo.lastgroup
-            value = mo.group(kind)
-            
-            if kind == 'NEWLINE':
-                line_start = mo.end()
+        for kind, start, end in self._spans():
+            while k < n_newlines and newlines[k] < start:
+                line_start = newlines[k] + 1
                 line_num += 1
-            elif kind == 'SKIP':
-                pass
-            elif kind == 'COMMENT':
-                pass
-            elif kind == 'MISMATCH':
-                # For now, just print or ignore, but strictly we should error
-                # print(f"Unexpected character: {value!r} on line {line_num}")
-                pass
-            else:
-                if kind == 'ID' and value.lower() in self.KEYWORDS:
-                    kind = value.upper() # Use the keyword as the token type
-                
-                column = mo.start() - line_start
-                self.tokens.append(token(kind, value, line_num, column))
+                k += 1
+            if kind == 'STRING':
+                while k < n_newlines and newlines[k] < end:
+                    k += 1
                 
-            mo = get_token(self.source_code, mo.end())
+            yield token(kind, source[start:end], line_num, start - line_start)
             
         # Add EOF token
-        self.tokens.append(token("EOF", "", line_num, 0))
-        return self.tokens
+        yield token("EOF", "", line_num + n_newlines - k, 0)
+
+    def tokenize_compact(self) -> 'TokenBuffer':
+        """
+        Tokenizes into a TokenBuffer: token kinds and offsets only, values
+        and positions are derived from the source when asked for.
+        """
+        source = self.source_code
+        buf = self._buffer()
+        kind_ids = buf.kind_ids
+        add_kind, add_start, add_end = buf.kinds.append, buf.starts.append, buf.ends.append
+        newline = b'\n' if self.is_bytes else '\n'
+        string_spans = [] # strings containing newlines
+        
+        for kind, start, end in self._spans():
+            if kind == 'STRING' and source.find(newline, start, end) != -1:
+                string_spans.append((start, end))
+            add_kind(kind_ids[kind])
+            add_start(start)
+            add_end(end)
+            
+        add_kind(kind_ids['EOF'])
+        add_start(len(source))
+        add_end(len(source))
+        
+        buf.set_line_starts(_line_breaks(source, string_spans))
+        return buf
+
+    def relex(self, previous: 'TokenBuffer', start: int, old_end: int, new_end: int) -> Tuple['TokenBuffer', TokenEdit]:
+        """
+        Tokenizes like tokenize_compact(), given the buffer of the source
+        before an edit: characters [start, old_end) of the previous source
+        became [start, new_end) of this one.
+
+        Scanning restarts at the last token that cannot see the edit and
+        stops at the first token start past it that the previous scan also
+        started a token at; from there on both scans agree, so the rest of
+        the previous buffer is reused with its offsets shifted. Returns the
+        new buffer and the token range that was replaced.
+        """
+        source = self.source_code
+        old_source = previous.source
+        delta = new_end - old_end
+        starts, ends = previous.starts, previous.ends
+        n_old = len(previous) - 1 # without EOF
+        
+        # A token's match looks at most two characters past its end (NUMBER
+        # trying "1.5" or "1E5"), except a lone quote, which failed to match
+        # a STRING all the way to the end of the source: it is the last quote
+        # before the edit, and a quote inserted after it can close it. If it
+        # directly follows a STRING (or is that STRING's closing quote), the
+        # two quotes can become a "" escape and the STRING itself extends.
+        first = bisect_left(ends, start - 2, 0, n_old)
+        quote = b'"' if self.is_bytes else '"'
+        if source.find(quote, start, new_end) != -1:
+            q = old_source.rfind(quote, 0, start)
+            k = bisect_right(starts, q, 0, n_old) - 1
+            if q == -1:
+                pass
+            elif k >= 0 and previous.kind(k) == 'STRING' and ends[k] in (q, q + 1):
+                first = min(first, k)
+            elif not (k >= 0 and previous.kind(k) == 'STRING' and ends[k] > q):
+                first = min(first, bisect_right(ends, q, 0, n_old))
+        restart = ends[first - 1] if first else 0
+        
+        buf = self._buffer()
+        kind_ids = buf.kind_ids
+        buf.kinds = previous.kinds[:first]
+        buf.starts = starts[:first]
+        buf.ends = ends[:first]
+        add_kind, add_start, add_end = buf.kinds.append, buf.starts.append, buf.ends.append
+        newline = b'\n' if self.is_bytes else '\n'
+        string_spans = []
+        
+        resume = n_old # previous token the scan resynchronized at
+        stop = len(source)
+        j = bisect_left(starts, old_end, 0, n_old)
+        for kind, s, e in self._spans(restart):
+            if s >= new_end:
+                while j < n_old and starts[j] < s - delta:
+                    j += 1
+                if j < n_old and starts[j] == s - delta:
+                    resume, stop = j, s
+                    break
+            if kind == 'STRING' and source.find(newline, s, e) != -1:
+                string_spans.append((s, e))
+            add_kind(kind_ids[kind])
+            add_start(s)
+            add_end(e)
+        new_last = len(buf.kinds)
+        
+        # The reused tail, ending with EOF
+        buf.kinds.extend(previous.kinds[resume:n_old])
+        buf.starts.extend(x + delta for x in starts[resume:n_old])
+        buf.ends.extend(x + delta for x in ends[resume:n_old])
+        add_kind(kind_ids['EOF'])
+        add_start(len(source))
+        add_end(len(source))
+        
+        # Line starts: the previous ones around the rescanned range, shifted
+        # after it, and the line breaks found inside it.
+        line_starts = previous.line_starts
+        old_stop = stop - delta
+        buf.line_starts = line_starts[:bisect_right(line_starts, restart)]
+        buf.line_starts.extend(n + 1 for n in _line_breaks(source, string_spans, restart, stop))
+        buf.line_starts.extend(x + delta for x in line_starts[bisect_left(line_starts, old_stop + 1):])
+        return buf, TokenEdit(first, resume, new_last)
+
+    # --- Scanner backends ---
+    # Both yield (kind, start, end) for every token except EOF, with
+    # keywords already resolved, and must agree exactly.
+
+    def _spans(self, pos: int = 0) -> Iterator[Tuple[str, int, int]]:
+        if self.backend == "table":
+            return self._scan_table(pos)
+        return self._scan_regex(pos)
+
+    def _scan_regex(self, pos: int) -> Iterator[Tuple[str, int, int]]:
+        keywords = self._keyword_kinds(self.is_bytes)
+        for mo in self._scanner(self.is_bytes).finditer(self.source_code, pos):
+            kind = mo.lastgroup
+            if kind == 'SKIP' or kind == 'COMMENT' or kind == 'MISMATCH':
+                # MISMATCH: for now ignore, but strictly we should error
+                continue
+            if kind == 'ID':
+                kind = keywords.get(mo.group().lower(), kind) # Use the keyword as the token type
+            yield kind, mo.start(), mo.end()
+
+    def _scan_table(self, pos: int) -> Iterator[Tuple[str, int, int]]:
+        """
+        First-character dispatch: whitespace, identifiers, numbers, strings
+        and comments are matched by one small pattern each, operators by a
+        one-character lookahead table. Characters outside the table (e.g.
+        non-ASCII) go through the TOKEN_SPEC regex so both backends agree.
+        """
+        source = self.source_code
+        for_bytes = self.is_bytes
+        table = self._dispatch_table(for_bytes)
+        keywords = self._keyword_kinds(for_bytes)
+        word, number, string, blank = (p.match for p in _TABLE_PATTERNS[for_bytes])
+        newline = b'\n' if for_bytes else '\n'
+        fallback = self._scanner(for_bytes).match
+        n = len(source)
+        
+        while pos < n:
+            entry = table.get(source[pos])
+            if entry is None:
+                mo = fallback(source, pos)
+                kind = mo.lastgroup
+                if kind == 'ID':
+                    kind = keywords.get(mo.group().lower(), kind)
+                if kind != 'SKIP' and kind != 'COMMENT' and kind != 'MISMATCH':
+                    yield kind, pos, mo.end()
+                pos = mo.end()
+                continue
+            
+            action, kind, pairs = entry
+            if action == _OP:
+                if pairs and pos + 1 < n:
+                    second = pairs.get(source[pos + 1])
+                    if second is not None:
+                        yield second, pos, pos + 2
+                        pos += 2
+                        continue
+                yield kind, pos, pos + 1
+                pos += 1
+            elif action == _WORD:
+                end = word(source, pos).end()
+                yield keywords.get(source[pos:end].lower(), 'ID'), pos, end
+                pos = end
+            elif action == _BLANK:
+                pos = blank(source, pos).end()
+            elif action == _NUMBER:
+                end = number(source, pos).end()
+                yield 'NUMBER', pos, end
+                pos = end
+            elif action == _DASH:
+                if pos + 1 < n and source[pos + 1] == pairs:
+                    # Comment runs to the end of the line
+                    end = source.find(newline, pos)
+                    pos = n if end == -1 else end
+                else:
+                    yield 'MINUS', pos, pos + 1
+                    pos += 1
+            elif action == _STRING:
+                mo = string(source, pos)
+                if mo is None:
+                    pos += 1 # Unterminated: a lone quote is a MISMATCH
+                else:
+                    yield 'STRING', pos, mo.end()
+                    pos = mo.end()
+            else: # _MISMATCH
+                pos += 1
+
+    @classmethod
+    def _scanner(cls, for_bytes: bool) -> 're.Pattern':
+        attr = '_compiled_bytes' if for_bytes else '_compiled'
+        if cls.__dict__.get(attr) is None:
+            pattern = '|'.join('(?P<%s>%s)' % pair for pair in cls.TOKEN_SPEC)
+            setattr(cls, attr, re.compile(pattern.encode('ascii') if for_bytes else pattern))
+        return cls.__dict__[attr]
+
+    @classmethod
+    def _keyword_kinds(cls, for_bytes: bool) -> Dict:
+        """Case-folded keyword (str or bytes) -> token type."""
+        return {(k.encode() if for_bytes else k): k.upper() for k in cls.KEYWORDS}
+
+    @classmethod
+    def _dispatch_table(cls, for_bytes: bool) -> Dict:
+        """First character (str, or int for bytes) -> (action, kind, lookahead)."""
+        attr = '_table_bytes' if for_bytes else '_table'
+        if cls.__dict__.get(attr) is None:
+            key = (lambda c: ord(c)) if for_bytes else (lambda c: c)
+            table = {key(chr(i)): (_MISMATCH, None, None) for i in range(256 if for_bytes else 128)}
+            for c in " \t\r\n":
+                table[key(c)] = (_BLANK, None, None)
+            for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz":
+                table[key(c)] = (_WORD, None, None)
+            for c in "0123456789":
+                table[key(c)] = (_NUMBER, None, None)
+            table[key('"')] = (_STRING, None, None)
+            table[key('-')] = (_DASH, None, key('-'))
+            for c, kind in _SINGLE_OPS.items():
+                pairs = {key(second): pair_kind for second, pair_kind in _DOUBLE_OPS.get(c, {}).items()}
+                table[key(c)] = (_OP, kind, pairs)
+            setattr(cls, attr, table)
+        return cls.__dict__[attr]
+
+# _scan_table actions
+_OP, _WORD, _BLANK, _NUMBER, _DASH, _STRING, _MISMATCH = range(7)
+
+# One-character tokens, and the two-character tokens they may start
+_SINGLE_OPS = {
+    "'": 'TICK', '(': 'LPAREN', ')': 'RPAREN', ';': 'SEMI', ':': 'COLON', ',': 'COMMA',
+    '.': 'DOT', '+': 'PLUS', '*': 'STAR', '/': 'SLASH', '=': 'EQ', '>': 'GT', '<': 'LT', '|': 'PIPE',
+}
+_DOUBLE_OPS = {
+    ':': {'=': 'ASSIGN'}, '/': {'=': 'NEQ'}, '>': {'=': 'GTE'},
+    '<': {'=': 'LTE', '>': 'BOX'}, '=': {'>': 'ARROW'}, '.': {'.': 'DOT_DOT'},
+}
+
+# Per-kind patterns for _scan_table (identifier, number, string, whitespace),
+# the same expressions as in TOKEN_SPEC; indexed by "source is bytes".
+_TABLE_SOURCES = [dict(AdaLexer.TOKEN_SPEC)[k] for k in ('ID', 'NUMBER', 'STRING', 'SKIP')]
+_TABLE_PATTERNS = {
+    False: [re.compile(p) for p in _TABLE_SOURCES],
+    True: [re.compile(p.encode('ascii')) for p in _TABLE_SOURCES],
+}
+
+def _newline_offsets(source, start: int = 0, end: Optional[int] = None) -> array:
+    """Offsets of every line feed in a str or bytes-like source (or in source[start:end])."""
+    newline = '\n' if isinstance(source, str) else b'\n'
+    if end is None:
+        end = len(source)
+    offsets = array('I')
+    find = source.find
+    i = find(newline, start, end)
+    while i != -1:
+        offsets.append(i)
+        i = find(newline, i + 1, end)
+    return offsets
+
+def _line_breaks(source, string_spans: List[Tuple[int, int]], start: int = 0, end: Optional[int] = None) -> Iterable[int]:
+    """
+    Offsets of the line feeds in source[start:end] that end a line: those
+    inside the (sorted) string literal spans do not, as in iter_tokens().
+    """
+    newlines = _newline_offsets(source, start, end)
+    if not string_spans:
+        return newlines
+    kept = []
+    j = 0
+    for n in newlines:
+        while j < len(string_spans) and string_spans[j][1] <= n:
+            j += 1
+        if j == len(string_spans) or n < string_spans[j][0]:
+            kept.append(n)
+    return kept
+
+class TokenStream:
+    """
+    Lazily filled token window over AdaLexer.iter_tokens().
+
+    Tokens are addressed by absolute index and pulled from the lexer on
+    first access, `lookahead` at a time. release(i) drops everything before
+    i unless a pin() holds it, so memory is bounded by the lookahead plus
+    any pinned span rather than by the file size. Indexes past the end of
+    the stream yield `past_end`.
+    """
+    def __init__(self, tokens: Iterator[token], lookahead: int = 2,
+                 past_end: token = token("EOF", "", -1, -1)):
+        self._it = tokens
+        self._buf = deque()
+        self._base = 0 # absolute index of _buf[0]
+        self._pins: List[int] = []
+        self._done = False
+        self.lookahead = max(1, lookahead)
+        self.past_end = past_end
+        self.max_buffered = 0
+
+    def at(self, i: int) -> token:
+        if i < self._base:
+            raise IndexError(f"Token {i} was already released")
+        while not self._done and i >= self._base + len(self._buf):
+            for _ in range(self.lookahead):
+                tok = next(self._it, None)
+                if tok is None:
+                    self._done = True
+                    break
+                self._buf.append(tok)
+            self.max_buffered = max(self.max_buffered, len(self._buf))
+        offset = i - self._base
+        return self._buf[offset] if offset < len(self._buf) else self.past_end
+
+    def release(self, i: int):
+        """Allows tokens before index i to be dropped."""
+        if self._pins:
+            i = min(i, min(self._pins))
+        while self._base < i and self._buf:
+            self._buf.popleft()
+            self._base += 1
+
+    def pin(self, i: int):
+        """Keeps tokens from index i on until the matching unpin(i)."""
+        self._pins.append(i)
+
+    def unpin(self, i: int):
+        self._pins.remove(i)
+
+class TokenBuffer:
+    """
+    Struct-of-arrays token store.
+
+    A token is an index: its kind is a small int in `kinds` (see
+    `kind_names`), its text is source[starts[i]:ends[i]], sliced only when
+    asked for. Lines are not stored per token; `line_starts` holds the
+    offset of every line start and line(i) bisects it. Costs about 9 bytes
+    per token instead of a token NamedTuple with its strings.
+    """
+    def __init__(self, source: Union[str, bytes, mmap.mmap], kind_names: Tuple[str, ...]):
+        self.source = source
+        self.is_bytes = not isinstance(source, str)
+        self.kind_names = kind_names
+        self.kind_ids: Dict[str, int] = {k: i for i, k in enumerate(kind_names)}
+        self.kinds = array('B')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.line_starts = array('I', [0])
+
+    def append(self, kind: str, start: int, end: int):
+        self.kinds.append(self.kind_ids[kind])
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def kind(self, i: int) -> str:
+        return self.kind_names[self.kinds[i]]
+
+    def value(self, i: int) -> str:
+        return self.text(self.starts[i], self.ends[i])
+
+    def text(self, start: int, end: int) -> str:
+        """Source text between two offsets; bytes sources are decoded as UTF-8, dropping invalid bytes."""
+        if self.is_bytes:
+            return self.source[start:end].decode('utf-8', 'ignore')
+        return self.source[start:end]
+
+    def line(self, i: int) -> int:
+        return bisect_right(self.line_starts, self.starts[i])
+
+    def column(self, i: int) -> int:
+        if self.kind_names[self.kinds[i]] == "EOF":
+            return 0
+        line_start = self.line_starts[self.line(i) - 1]
+        if self.is_bytes:
+            # Columns count characters, as for the decoded text
+            return len(self.text(line_start, self.starts[i]))
+        return self.starts[i] - line_start
+
+    def token(self, i: int) -> 'BufferedToken':
+        return BufferedToken(self.kind_names[self.kinds[i]], self, i)
+
+    def __getitem__(self, i: int) -> token:
+        """Materializes token i as a lexer token."""
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return token(self.kind(i), self.value(i), self.line(i), self.column(i))
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def set_line_starts(self, newlines: Iterable[int]):
+        """Builds the line index from the offsets of the line-ending characters."""
+        self.line_starts = array('I', [0])
+        self.line_starts.extend(n + 1 for n in newlines)
+
+    def nbytes(self) -> int:
+        """Memory held by the arrays (the source text is shared, not counted)."""
+        return sum(a.buffer_info()[1] * a.itemsize for a in (self.kinds, self.starts, self.ends, self.line_starts))
+
+class BufferedToken:
+    """A view of one TokenBuffer entry with the token attributes; value/line/column are computed on access."""
+    __slots__ = ('type', '_buffer', '_index')
+
+    def __init__(self, type: str, buffer: TokenBuffer, index: int):
+        self.type = type
+        self._buffer = buffer
+        self._index = index
+
+    @property
+    def value(self) -> str:
+        return self._buffer.value(self._index)
+
+    @property
+    def line(self) -> int:
+        return self._buffer.line(self._index)
+
+    @property
+    def column(self) -> int:
+        return self._buffer.column(self._index)
+
+    def __repr__(self) -> str:
+        return repr(self._buffer[self._index])
 
 if __name__ == "__main__":
     # Simple test
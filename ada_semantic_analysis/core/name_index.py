@@ -0,0 +1,30 @@
+from typing import Dict, FrozenSet, List, Set
+
+_EMPTY: FrozenSet[str] = frozenset()
+
+def suffixes(qualified: str) -> List[str]:
+    """Lowercased dotted suffixes of a name, shortest first: "A.B" -> ["b", "a.b"]."""
+    parts = qualified.lower().split('.')
+    return ['.'.join(parts[i:]) for i in range(len(parts) - 1, -1, -1)]
+
+class NameIndex:
+    """
+    Resolves simple or partially qualified names to fully qualified ones.
+
+    Every dotted suffix of a registered name ("A.B.C" -> "c", "b.c",
+    "a.b.c") is a key, folded to lower case since Ada identifiers are case
+    insensitive. Lookups are a single dict probe.
+    """
+    def __init__(self):
+        self._by_suffix: Dict[str, Set[str]] = {}
+
+    def add(self, qualified: str):
+        for suffix in suffixes(qualified):
+            self._by_suffix.setdefault(suffix, set()).add(qualified)
+
+    def resolve(self, name: str) -> Set[str]:
+        """Qualified names that `name` can refer to (empty if none)."""
+        return self._by_suffix.get(name.lower(), _EMPTY)
+
+    def __contains__(self, name: str) -> bool:
+        return name.lower() in self._by_suffix
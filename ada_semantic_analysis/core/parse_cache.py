@@ -0,0 +1,116 @@
+import hashlib
+import os
+import pickle
+from typing import Optional
+
+from . import ast_nodes, lexer, parser
+from .ast_nodes import CompilationUnitNode
+
+def schema_tag() -> str:
+    """
+    Identifies the current parser output format. Derived from PARSER_VERSION
+    and the source of the lexer, parser and AST node modules, so editing any
+    of them invalidates every cached entry.
+    """
+    h = hashlib.sha256(f"v{parser.PARSER_VERSION}".encode())
+    for module in (lexer, parser, ast_nodes):
+        with open(module.__file__, 'rb') as fh:
+            h.update(fh.read())
+    return h.hexdigest()[:16]
+
+class ParseCache:
+    """
+    Content-addressed on-disk cache of parsed CompilationUnitNodes.
+
+    Entries are keyed by a hash of the raw file bytes plus the schema tag,
+    so identical sources hit regardless of path. The directory is capped at
+    `max_bytes`; least recently used entries (by mtime, refreshed on every
+    hit) are evicted first. Entries of an older schema simply stop matching
+    and age out through the same LRU.
+    """
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+    SUFFIX = '.pkl'
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES, schema: Optional[str] = None):
+        self.directory = directory or os.path.join(os.path.expanduser("~"), ".cache", "ada_semantic_analysis", "parse")
+        self.max_bytes = max_bytes
+        self.schema = schema or schema_tag()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+        self._total_bytes = sum(size for _, size, _ in self._entries())
+
+    def key(self, source: bytes) -> str:
+        return self.key_for_digest(hashlib.sha256(source).hexdigest())
+
+    def key_for_digest(self, digest: str) -> str:
+        """Cache key for a file whose bytes hash (SHA-256 hex) is already known."""
+        return hashlib.sha256(f"{self.schema}:{digest}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[CompilationUnitNode]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as fh:
+                unit = pickle.load(fh)
+            os.utime(path) # LRU touch
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # Truncated or unreadable entry: drop it and re-parse.
+            self._remove(path)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return unit
+
+    def put(self, key: str, unit: CompilationUnitNode):
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, 'wb') as fh:
+                pickle.dump(unit, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp, path)
+        except (OSError, pickle.PicklingError, RecursionError):
+            self._remove(tmp)
+            return
+        self._total_bytes += os.path.getsize(path) - old_size
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def clear(self):
+        for path, _, _ in self._entries():
+            self._remove(path)
+        self._total_bytes = 0
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda e: e[2]) # oldest first
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+        self._total_bytes = total
+
+    def _entries(self):
+        """Yields (path, size, mtime) for every cache entry."""
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(self.SUFFIX):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    yield entry.path, st.st_size, st.st_mtime
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -1,29 +1,229 @@
-from .lexer import AdaLexer, token
+import hashlib
+import re
+import time
+import weakref
+from array import array
+from functools import partial
+from operator import itemgetter
+from .lexer import AdaLexer, TokenBuffer, TokenEdit, TokenStream, token
 from .ast_nodes import *
-from typing import List, Optional
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+# Bump when the parser output changes in a way the source digest of this
+# module would not reveal (e.g. a behaviour change in a dependency).
+PARSER_VERSION = 1
 
 class PartialAnalysisError(Exception):
     """Raised when the parser encounters ambiguous or unsupported constructs."""
     pass
 
+class SkippedSpan(NamedTuple):
+    """Tokens [start, end) the parser skipped over to recover from `rule`."""
+    rule: str
+    start: int
+    end: int
+    line: int
+
+class SyncIndex:
+    """
+    Next-occurrence tables over a token list or TokenBuffer: find(kinds, i)
+    is the index of the first token at or after i whose kind is in `kinds`,
+    or of EOF. The table of a kind is built the first time it is asked
+    for, one slice fill per occurrence; lookups are then O(1).
+    """
+    def __init__(self, tokens: Union[List[token], TokenBuffer]):
+        self.tokens = tokens
+        self.eof = len(tokens) - 1
+        self._tables: Dict[str, array] = {}
+        self._types: Optional[List[str]] = None
+
+    def find(self, kinds: Sequence[str], i: int) -> int:
+        if i >= self.eof:
+            return self.eof
+        tables = self._tables
+        found = self.eof
+        for kind in kinds:
+            table = tables.get(kind)
+            if table is None:
+                table = tables[kind] = self._build(kind)
+            found = min(found, table[i])
+        return found
+
+    def _build(self, kind: str) -> array:
+        table = array('I', [self.eof]) * len(self.tokens)
+        filled = 0
+        for pos in self._occurrences(kind):
+            table[filled:pos + 1] = array('I', [pos]) * (pos + 1 - filled)
+            filled = pos + 1
+        return table
+
+    def _occurrences(self, kind: str):
+        if isinstance(self.tokens, TokenBuffer):
+            if kind not in self.tokens.kind_ids:
+                return
+            kinds = self.tokens.kinds.tobytes()
+            needle = bytes([self.tokens.kind_ids[kind]])
+            pos = kinds.find(needle)
+            while pos != -1:
+                yield pos
+                pos = kinds.find(needle, pos + 1)
+            return
+        if self._types is None:
+            self._types = list(map(itemgetter(0), self.tokens))
+        pos = -1
+        while True:
+            try:
+                pos = self._types.index(kind, pos + 1)
+            except ValueError:
+                return
+            yield pos
+
 class AdaParser:
     """
     This module implements a Simplified Structural AST Builder intended for 
     semantic comparison and change impact analysis, not a full ADA compiler 
     or language-complete parser.
+
+    Every scan stops at EOF, so any input terminates. token_budget (token
+    advances, counting re-reads after a rewind) and time_budget (seconds,
+    lexing included) bound the work spent on one file; exceeding either
+    raises PartialAnalysisError.
+
+    lazy_bodies: the statements of subprogram bodies are not parsed; the
+    body is delimited by BEGIN/IF/LOOP/CASE/RECORD/SELECT ... END nesting
+    and kept as LazyStatements, parsed when first read, within the same
+    budgets. A body the statement parser does not read up to that END
+    (e.g. one holding a select) raises PartialAnalysisError when parsed,
+    as its statements past the stop would otherwise be lost.
+
+    Constructs the parser does not model are skipped up to the first token
+    of their rule's SYNC_SETS entry; with random-access tokens that is one
+    jump through a SyncIndex rather than a token-by-token scan. Unsupported
+    constructs skipped this way are recorded in `skipped` (see recover()).
     """
-    def __init__(self, lexer: AdaLexer):
+    # Advances between two clock reads when a time budget is set
+    BUDGET_CHECK_INTERVAL = 1024
+
+    # Token kinds opening a construct closed by END inside a body (lazy_bodies)
+    BODY_OPENERS = ("BEGIN", "IF", "LOOP", "CASE", "RECORD", "SELECT")
+
+    # Token kinds a skipped construct of each rule ends before
+    SYNC_SETS = {
+        "context_clause": ("SEMI",),
+        "statement": ("SEMI",),
+        "declaration": ("SEMI",),
+        "instantiation": ("SEMI",),
+        "array_type": ("ASSIGN", "SEMI"),
+        "record_components": ("END",),
+        "task_header": ("IS", "SEMI"),
+        "task_body": ("END",),
+        "call_arguments": ("RPAREN",),
+    }
+
+    def __init__(self, lexer: AdaLexer, streaming: bool = False, compact: bool = False,
+                 tokens: Optional[TokenBuffer] = None, token_budget: Optional[int] = None,
+                 time_budget: Optional[float] = None, lazy_bodies: bool = False):
+        compact = compact or tokens is not None or lazy_bodies
+        if streaming and compact:
+            raise ValueError("streaming and compact token modes are exclusive")
+        self.lazy_bodies = lazy_bodies
+        self._nesting = None # see _body_end()
+        self._parse_body = partial(_parse_body, token_budget=token_budget, time_budget=time_budget)
+        self.token_budget = token_budget
+        self.time_budget = time_budget
+        self.steps = 0 # tokens advanced over
+        self._started = time.perf_counter()
+        self._next_check = self._budget_step(0)
         self.lexer = lexer
-        self.tokens = self.lexer.tokenize()
+        # streaming: pull tokens from the lexer as parsing advances instead
+        # of tokenizing the whole file up front (see TokenStream).
+        # compact: keep tokens in a struct-of-arrays TokenBuffer.
+        # tokens: a TokenBuffer lexed already (e.g. by AdaLexer.relex).
+        self.streaming = streaming
+        self.compact = compact
+        # (start, end, node) of every subprogram and package parsed, nested
+        # ones first; the tokens of the item are [start, end)
+        self.item_spans: List[Tuple[int, int, ASTNode]] = []
+        self._previous = None # see reparse_compilation_unit()
+        self.skipped: List[SkippedSpan] = [] # see recover()
+        if streaming:
+            self.tokens = TokenStream(self.lexer.iter_tokens())
+        elif tokens is not None:
+            self.tokens = tokens
+        elif compact:
+            self.tokens = self.lexer.tokenize_compact()
+        else:
+            self.tokens = self.lexer.tokenize()
+        # Streamed tokens cannot be jumped over: skip_to() scans them
+        self.sync = None if streaming else SyncIndex(self.tokens)
+        if lazy_bodies:
+            _body_sync_indexes[self.tokens] = self.sync
         self.pos = 0
-        self.current_token = self.tokens[0]
+        self.current_token = self._token_at(0)
+
+    def _token_at(self, pos: int) -> token:
+        if self.streaming:
+            self.tokens.release(pos)
+            return self.tokens.at(pos)
+        if pos < len(self.tokens):
+            return self.tokens.token(pos) if self.compact else self.tokens[pos]
+        return token("EOF", "", -1, -1)
 
     def advance(self):
         self.pos += 1
-        if self.pos < len(self.tokens):
-            self.current_token = self.tokens[self.pos]
+        self.current_token = self._token_at(self.pos)
+        self.steps += 1
+        if self.steps >= self._next_check:
+            self._check_budget()
+
+    def _budget_step(self, steps: int) -> float:
+        """The step count at which the budget is checked next."""
+        limits = []
+        if self.token_budget is not None:
+            limits.append(self.token_budget + 1)
+        if self.time_budget is not None:
+            limits.append(steps + self.BUDGET_CHECK_INTERVAL)
+        return min(limits) if limits else float("inf")
+
+    def _check_budget(self):
+        if self.token_budget is not None and self.steps > self.token_budget:
+            raise PartialAnalysisError(
+                f"Token budget of {self.token_budget} exceeded at line {self.current_token.line}")
+        if self.time_budget is not None and time.perf_counter() - self._started > self.time_budget:
+            raise PartialAnalysisError(
+                f"Time budget of {self.time_budget}s exceeded at line {self.current_token.line}")
+        self._next_check = self._budget_step(self.steps)
+
+    def mark(self) -> int:
+        """Returns the current position, keeping it reachable by rewind() until unmark()."""
+        if self.streaming:
+            self.tokens.pin(self.pos)
+        return self.pos
+
+    def rewind(self, pos: int):
+        self.pos = pos
+        self.current_token = self._token_at(pos)
+
+    def unmark(self, pos: int):
+        if self.streaming:
+            self.tokens.unpin(pos)
+
+    def skip_to(self, rule: str):
+        """Moves to the next token in SYNC_SETS[rule], or to EOF."""
+        stops = self.SYNC_SETS[rule]
+        if self.sync is None:
+            while self.peek() not in stops and self.peek() != "EOF":
+                self.advance()
         else:
-            self.current_token = token("EOF", "", -1, -1)
+            self.rewind(self.sync.find(stops, self.pos))
+
+    def recover(self, rule: str, start: int, line: int):
+        """
+        skip_to(rule) past an unsupported `rule` construct that began at
+        token `start` on `line`, recording the tokens skipped since.
+        """
+        self.skip_to(rule)
+        self.skipped.append(SkippedSpan(rule, start, self.pos, line))
 
     def match(self, token_type: str) -> bool:
         if self.current_token.type == token_type:
@@ -41,23 +241,32 @@ class AdaParser:
     def peek(self) -> str:
         return self.current_token.type
 
+    def text_until(self, stop: str, prefix: str = "") -> Text:
+        """
+        Consumes the tokens before the next `stop` token (or EOF) and returns
+        their text, each value followed by a space. The text is a TokenSpan,
+        joined only when read; streaming drops tokens as it goes, so there
+        the text is joined right away.
+        """
+        start = self.pos
+        if self.streaming:
+            values = []
+            while self.peek() != stop and self.peek() != "EOF":
+                values.append(self.current_token.value)
+                self.advance()
+            return prefix + "".join(v + " " for v in values)
+        while self.peek() != stop and self.peek() != "EOF":
+            self.advance()
+        return TokenSpan(self.tokens, start, self.pos, prefix)
+
     # --- Grammar Rules ---
 
     def parse_compilation_unit(self) -> CompilationUnitNode:
         units = []
+        self.item_spans = []
         try:
             while self.peek() != "EOF":
-                if self.peek() == "WITH" or self.peek() == "USE":
-                    self.parse_context_clause()
-                
-                if self.peek() in ("PROCEDURE", "FUNCTION"):
-                    units.append(self.parse_subprogram())
-                elif self.peek() == "PACKAGE":
-                    units.append(self.parse_package())
-                else:
-                    # Fail Semantic Safety: Do not guess.
-                    # Flag manual review required for unsupported top-level items.
-                    raise PartialAnalysisError(f"Unexpected top-level token: {self.current_token}")
+                units.append(self.parse_top_level())
         except PartialAnalysisError as e:
             # Re-raise to be caught by caller (App/Script)
             raise e
@@ -67,12 +276,83 @@ class AdaParser:
             
         return CompilationUnitNode(files=units)
 
+    def reparse_compilation_unit(self, previous_spans: List[Tuple[int, int, ASTNode]],
+                                 previous_tokens: TokenBuffer, edit: TokenEdit) -> CompilationUnitNode:
+        """
+        Parses the tokens of an edited source (see AdaLexer.relex), given the
+        item_spans of the parse of the previous tokens. A subprogram or
+        package whose tokens, and the token after them, are all outside the
+        edited range is taken over from the previous parse as it is (keeping
+        its memoized struct_hash), with its line numbers shifted in place;
+        only the items containing the edit are parsed again.
+        """
+        self._previous = (previous_spans, {start: k for k, (start, _, _) in enumerate(previous_spans)},
+                          previous_tokens, edit)
+        try:
+            return self.parse_compilation_unit()
+        finally:
+            self._previous = None
+
+    def parse_top_level(self) -> ASTNode:
+        if self.peek() == "WITH" or self.peek() == "USE":
+            self.parse_context_clause()
+        
+        if self.peek() in ("PROCEDURE", "FUNCTION"):
+            return self.parse_item(self.parse_subprogram)
+        elif self.peek() == "PACKAGE":
+            return self.parse_item(self.parse_package)
+        else:
+            # Fail Semantic Safety: Do not guess.
+            # Flag manual review required for unsupported top-level items.
+            raise PartialAnalysisError(f"Unexpected top-level token: {self.current_token}")
+
+    def parse_item(self, parse) -> ASTNode:
+        """
+        Runs parse_subprogram/parse_package and records the item's token
+        span, or reuses the item from the previous parse when reparsing.
+        """
+        start = self.pos
+        if self._previous is not None:
+            node = self._reuse(start)
+            if node is not None:
+                return node
+        node = parse()
+        self.item_spans.append((start, self.pos, node))
+        return node
+
+    def _reuse(self, start: int) -> Optional[ASTNode]:
+        spans, by_start, previous_tokens, edit = self._previous
+        shift = edit.new_end - edit.old_end
+        if start < edit.start:
+            k, offset = by_start.get(start), 0
+            if k is None or spans[k][1] >= edit.start:
+                return None
+        elif start >= edit.new_end:
+            k, offset = by_start.get(start - shift), shift
+            if k is None:
+                return None
+        else:
+            return None
+
+        old_start, old_end, node = spans[k]
+        if start >= edit.new_end:
+            # Lines after the edit moved by as many as it added
+            line_delta = self.current_token.line - previous_tokens.line(old_start)
+            if line_delta:
+                _shift_lines(node, line_delta)
+        # The item and everything nested in it (recorded before it)
+        nested = k
+        while nested > 0 and spans[nested - 1][0] > old_start:
+            nested -= 1
+        self.item_spans.extend((s + offset, e + offset, n) for s, e, n in spans[nested:k + 1])
+        self.rewind(old_end + offset)
+        return node
+
     def parse_context_clause(self):
         while self.peek() in ("WITH", "USE"):
             self.advance()
             # Consume until semicolon
-            while self.peek() != "SEMI" and self.peek() != "EOF":
-                self.advance()
+            self.skip_to("context_clause")
             self.match("SEMI")
 
     def parse_package(self) -> PackageNode:
@@ -124,10 +404,10 @@ class AdaParser:
         if self.match("IS"):
             # It's a body or strict declaration?
             # Special case: "procedure X is new ..." (Generics - not supported yet but check)
+            start, line = self.pos, self.current_token.line
             if self.match("NEW"):
                 # Instantiation - Skip for now
-                while self.peek() != "SEMI":
-                    self.advance()
+                self.recover("instantiation", start, line)
                 self.match("SEMI")
                 # Return empty node?
                 return SubprogramNode(name=name, kind=kind, parameters=params, return_type=return_type, is_body=False)
@@ -135,7 +415,10 @@ class AdaParser:
             is_body = True
             decls = self.parse_declarations()
             self.expect("BEGIN")
-            stmts = self.parse_statements()
+            if self.lazy_bodies:
+                stmts = self._lazy_statements()
+            else:
+                stmts = self.parse_statements()
             self.expect("END")
             # Optional name matching
             if self.peek() == "ID":
@@ -159,6 +442,41 @@ class AdaParser:
 
         return SubprogramNode(name=name, kind=kind, parameters=params, return_type=return_type, declarations=decls, statements=stmts, is_body=is_body)
 
+    def _lazy_statements(self) -> LazyStatements:
+        """Skips the statements of the current body, returning them unparsed."""
+        tokens, start = self.tokens, self.pos
+        end = self._body_end(start)
+        span = tokens.source[tokens.starts[start]:tokens.starts[end]]
+        if isinstance(span, str):
+            span = span.encode()
+        lazy = LazyStatements(self._parse_body, tokens, start, end, tokens.line(start), hashlib.md5(span).hexdigest())
+        self.rewind(end)
+        return lazy
+
+    def _body_end(self, start: int) -> int:
+        """
+        Index of the END closing the body whose statements begin at `start`
+        (EOF if there is none). An opener right after END, "(" or NULL
+        opens nothing: "end if", "(if ...)", "null record".
+        """
+        if self._nesting is None:
+            ids = self.tokens.kind_ids
+            markers = bytes(ids[k] for k in self.BODY_OPENERS + ("END",))
+            self._nesting = (self.tokens.kinds.tobytes(),
+                             re.compile(b"[" + b"".join(re.escape(bytes([m])) for m in markers) + b"]"),
+                             ids["END"], bytes(ids[k] for k in ("END", "LPAREN", "NULL")))
+        kinds, pattern, end_id, inert_after = self._nesting
+        depth = 1
+        for m in pattern.finditer(kinds, start):
+            i = m.start()
+            if kinds[i] == end_id:
+                depth -= 1
+                if depth == 0:
+                    return i
+            elif kinds[i - 1] not in inert_after:
+                depth += 1
+        return len(self.tokens) - 1
+
     def parse_compound_name(self) -> str:
         name = self.expect("ID").value
         while self.match("DOT"):
@@ -217,12 +535,11 @@ class AdaParser:
                 self.advance() # name
                 self.expect("IS")
                 # consume until semi
-                while self.peek() != "SEMI":
-                    self.advance()
+                self.skip_to("declaration")
                 self.match("SEMI")
             elif self.peek() in ("PROCEDURE", "FUNCTION"):
                  # Parse subprogram (spec or body)
-                 decls.append(self.parse_subprogram())
+                 decls.append(self.parse_item(self.parse_subprogram))
 
             elif self.peek() == "ID":
                 # Variable declaration? "X : Integer := 1;"
@@ -231,36 +548,34 @@ class AdaParser:
             elif self.peek() == "FOR":
                 # Representation clause? "for Type use ..."
                 # Skip until semi
-                while self.peek() != "SEMI":
-                    self.advance()
+                self.skip_to("declaration")
                 self.match("SEMI")
             elif self.peek() == "PRAGMA":
-                 while self.peek() != "SEMI":
-                     self.advance()
+                 self.skip_to("declaration")
                  self.match("SEMI")
             elif self.peek() == "USE":
                   self.parse_context_clause()
             elif self.peek() == "PACKAGE":
                  # Nested package
-                 decls.append(self.parse_package())
+                 decls.append(self.parse_item(self.parse_package))
             elif self.peek() in ("TASK", "PROTECTED"):
                 # Skip complex types for now
-                while self.peek() != "IS" and self.peek() != "SEMI":
-                    self.advance()
+                start, line = self.pos, self.current_token.line
+                self.skip_to("task_header")
                 if self.match("IS"):
-                     while self.peek() != "END":
-                         self.advance()
+                     self.skip_to("task_body")
                      self.match("END")
                      self.advance() # ID
                      self.match("SEMI")
                 else:
                     self.match("SEMI")
+                self.skipped.append(SkippedSpan("task", start, self.pos, line))
             else:
                  # Unknown declaration, consume until semi to recover
                 # print(f"Skipping unknown declaration starting with {self.current_token}")
+                start, line = self.pos, self.current_token.line
                 self.advance()
-                while self.peek() != "SEMI" and self.peek() != "EOF":
-                    self.advance()
+                self.recover("declaration", start, line)
                 self.match("SEMI")
                 
         return decls
@@ -281,8 +596,7 @@ class AdaParser:
         # Could be "array (...) of ..." or just ID
         if self.peek() == "ARRAY":
             # consume array type def
-            while self.peek() != "ASSIGN" and self.peek() != "SEMI":
-                self.advance()
+            self.skip_to("array_type")
             type_name = "ARRAY"
         elif self.peek() == "ACCESS":
             self.advance()
@@ -297,10 +611,7 @@ class AdaParser:
         if self.match("ASSIGN"):
             # consume expression until semi
             # Simplified: just grab string
-            initial_val = ""
-            while self.peek() != "SEMI":
-                initial_val += self.current_token.value + " "
-                self.advance()
+            initial_val = self.text_until("SEMI")
                 
         self.match("SEMI")
         return VariableDeclNode(names=names, type_name=type_name, initial_value=initial_val)
@@ -317,15 +628,12 @@ class AdaParser:
         type_def = ""
         if self.match("RECORD"):
             # consume components
-            while self.peek() != "END":
-                self.advance() # component
+            self.skip_to("record_components")
             self.expect("END")
             self.match("RECORD")
             type_def = "RECORD"
         else:
-            while self.peek() != "SEMI":
-                type_def += self.current_token.value + " "
-                self.advance()
+            type_def = self.text_until("SEMI")
                 
         self.match("SEMI")
         return TypeDeclNode(name=name, type_def=type_def)
@@ -339,28 +647,26 @@ class AdaParser:
                 stmts.append(self.parse_loop())
             elif self.peek() == "RETURN":
                 self.advance()
-                expr = ""
-                if self.peek() != "SEMI":
-                    # consume expr
-                    while self.peek() != "SEMI":
-                        expr += self.current_token.value + " "
-                        self.advance()
+                # consume expr
+                expr = self.text_until("SEMI")
                 self.match("SEMI")
                 stmts.append(ReturnNode(expression=expr))
             elif self.peek() == "ID":
                 # Assignment or Call
                 # Lookahead
-                save_pos = self.pos
-                line = self.current_token.line # Capture line
-                name = self.parse_compound_name()
+                save_pos = self.mark()
+                try:
+                    line = self.current_token.line # Capture line
+                    name = self.parse_compound_name()
+                    if self.peek() not in ("ASSIGN", "SEMI", "LPAREN"):
+                        self.rewind(save_pos)
+                finally:
+                    self.unmark(save_pos)
                 
                 if self.peek() == "ASSIGN":
                     # Assignment
                     self.advance()
-                    expr = ""
-                    while self.peek() != "SEMI":
-                         expr += self.current_token.value + " "
-                         self.advance()
+                    expr = self.text_until("SEMI")
                     self.match("SEMI")
                     stmts.append(AssignmentNode(target=name, expression=expr, line=line))
                     
@@ -369,25 +675,22 @@ class AdaParser:
                      args = []
                      if self.match("LPAREN"):
                          # consume args
-                         while self.peek() != "RPAREN":
-                             self.advance() 
+                         self.skip_to("call_arguments")
                          self.match("RPAREN")
                      
                      self.match("SEMI")
                      stmts.append(CallNode(name=name, arguments=args, line=line))
                 else:
                     # Could be label? <<Label>>
-                    # For now recover
-                    self.pos = save_pos
+                    # For now recover (rewound to the ID above)
+                    start, line = self.pos, self.current_token.line
                     self.advance() # consume ID
                     # consume until semi
-                    while self.peek() != "SEMI":
-                        self.advance()
+                    self.recover("statement", start, line)
                     self.match("SEMI")
             elif self.peek() in ("EXIT", "NULL", "PRAGMA", "DELAY", "RAISE"):
                 # Simple statements
-                 while self.peek() != "SEMI":
-                     self.advance()
+                 self.skip_to("statement")
                  self.match("SEMI")
                  
             elif self.peek() == "CASE":
@@ -403,19 +706,16 @@ class AdaParser:
             else:
                  # Recover
                  # print(f"Skipping unknown statement starting with {self.current_token}")
+                 start, line = self.pos, self.current_token.line
                  self.advance()
-                 while self.peek() != "SEMI" and self.peek() != "EOF":
-                     self.advance()
+                 self.recover("statement", start, line)
                  self.match("SEMI")
 
         return stmts
 
     def parse_if(self) -> IfNode:
         self.expect("IF")
-        cond = ""
-        while self.peek() != "THEN":
-            cond += self.current_token.value + " "
-            self.advance()
+        cond = self.text_until("THEN")
         self.expect("THEN")
         
         then_block = self.parse_statements()
@@ -423,10 +723,7 @@ class AdaParser:
         else_block = None
         
         while self.match("ELSIF"):
-             e_cond = ""
-             while self.peek() != "THEN":
-                 e_cond += self.current_token.value + " "
-                 self.advance()
+             e_cond = self.text_until("THEN")
              self.expect("THEN")
              e_stmts = self.parse_statements()
              elsif_parts.append(ElsifNode(condition=e_cond, statements=e_stmts))
@@ -447,15 +744,9 @@ class AdaParser:
         
         iteration = None
         if self.match("WHILE"):
-            iteration = "WHILE "
-            while self.peek() != "LOOP":
-                iteration += self.current_token.value + " "
-                self.advance()
+            iteration = self.text_until("LOOP", "WHILE ")
         elif self.match("FOR"):
-             iteration = "FOR "
-             while self.peek() != "LOOP":
-                 iteration += self.current_token.value + " "
-                 self.advance()
+             iteration = self.text_until("LOOP", "FOR ")
                  
         self.expect("LOOP")
         stmts = self.parse_statements()
@@ -470,19 +761,13 @@ class AdaParser:
     def parse_case(self) -> CaseNode:
         self.expect("CASE")
         # Consume expression until IS
-        expression = ""
-        while self.peek() != "IS":
-             expression += self.current_token.value + " "
-             self.advance()
+        expression = self.text_until("IS")
         self.expect("IS")
         
         when_parts = []
-        while self.peek() != "END":
+        while self.peek() != "END" and self.peek() != "EOF":
             if self.match("WHEN"):
-                choices = ""
-                while self.peek() != "ARROW":
-                    choices += self.current_token.value + " "
-                    self.advance()
+                choices = self.text_until("ARROW")
                 self.match("ARROW")
                 statements = self.parse_statements()
                 when_parts.append(WhenNode(choices=choices, statements=statements))
@@ -499,3 +784,55 @@ class AdaParser:
         self.match("SEMI")
         
         return CaseNode(expression=expression, when_parts=when_parts)
+
+# The SyncIndex of each TokenBuffer parsed with lazy_bodies, shared by the
+# parsers of its bodies so that its tables are built once
+_body_sync_indexes: "weakref.WeakKeyDictionary[TokenBuffer, SyncIndex]" = weakref.WeakKeyDictionary()
+
+def _parse_body(source, start: int, end: Optional[int], line_delta: int,
+                token_budget: Optional[int] = None, time_budget: Optional[float] = None) -> List[ASTNode]:
+    """
+    Parses the statements of a LazyStatements span; `source` is its
+    TokenBuffer or text (whose last token is the closing END).
+    """
+    budgets = {"token_budget": token_budget, "time_budget": time_budget}
+    if isinstance(source, str):
+        parser = AdaParser(AdaLexer(source), compact=True, **budgets)
+        end = len(parser.tokens) - 2 # the END, before EOF
+    else:
+        parser = AdaParser(AdaLexer(source.source), tokens=source, **budgets)
+        parser.sync = _body_sync_indexes.setdefault(source, parser.sync)
+        parser.rewind(start)
+    try:
+        statements = parser.parse_statements()
+        parser.expect("END")
+    except PartialAnalysisError:
+        raise
+    except Exception as e:
+        raise PartialAnalysisError(f"Parser Crash at line {parser.current_token.line + line_delta}: {e}")
+    if parser.pos != end + 1:
+        # Stopped at an END other than the body's: do not guess what was left out
+        raise PartialAnalysisError(
+            f"Unsupported statement in body at line {parser.current_token.line + line_delta}")
+    if line_delta:
+        for statement in statements:
+            _shift_lines(statement, line_delta)
+    return statements
+
+def _shift_lines(node: ASTNode, delta: int):
+    """Moves every line number recorded in the subtree by `delta` (unset lines stay 0)."""
+    if node.line:
+        node.line += delta
+    for name in child_fields(type(node)):
+        value = getattr(node, name)
+        if isinstance(value, LazyStatements):
+            if not value.expanded:
+                value.shift(delta)
+                continue
+            value = value.statements
+        if isinstance(value, list):
+            for item in value:
+                if isinstance(item, ASTNode):
+                    _shift_lines(item, delta)
+        elif isinstance(value, ASTNode):
+            _shift_lines(value, delta)
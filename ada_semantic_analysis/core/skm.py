@@ -1,6 +1,8 @@
 from dataclasses import dataclass, field
-from typing import Dict, List, Set, Optional
+from typing import Dict, List, Set, Optional, Tuple
 import networkx as nx
+from .call_graph import CompactCallGraph
+from .name_index import NameIndex, suffixes
 
 @dataclass
 class VariableInfo:
@@ -24,17 +26,69 @@ class ProcedureInfo:
     call_locations: Dict[str, List[int]] = field(default_factory=dict) # K: Callee, V: List[Lines]
     cyclomatic_complexity: int = 1
     body_hash: str = ""
+    statement_hashes: List[str] = field(default_factory=list) # structural hash per top-level statement
+    # Memoized BehavioralFingerprint (see BehavioralFingerprint.of)
+    fingerprint_cache: Optional[object] = field(default=None, init=False, repr=False, compare=False)
+
+    def invalidate_fingerprint(self):
+        """Must be called whenever a field covered by the fingerprint changes."""
+        self.fingerprint_cache = None
+
+@dataclass
+class BodySummary:
+    """
+    What the statements of one lazily parsed subprogram body contributed,
+    recorded by SKMBuilder under the body's LazyStatements.span_hash.
+    """
+    line: int # line of the body's first token; the call lines below are absolute
+    statement_hashes: List[str]
+    calls: List[Tuple[str, int]] = field(default_factory=list) # (callee, line) in call order
+    writes: List[str] = field(default_factory=list)
+    decisions: int = 0 # ifs and loops, each adding 1 to the cyclomatic complexity
 
 class SystemKnowledgeModel:
     def __init__(self, name: str):
         self.name = name
         self.variables: Dict[str, VariableInfo] = {} # Keyed by full qualified name
         self.procedures: Dict[str, ProcedureInfo] = {} # Keyed by full qualified name
-        self.call_graph = nx.DiGraph()
+        self.compact_call_graph = CompactCallGraph()
         self.data_dependency_graph = nx.DiGraph()
+        # Simple/partially qualified name -> qualified names (case insensitive)
+        self.procedure_names = NameIndex()
+        self.variable_names = NameIndex()
+        # Inverted indexes over the registered procedures
+        self.writers: Dict[str, Set[str]] = {} # variable (as written) -> procedures writing it
+        self.readers: Dict[str, Set[str]] = {} # variable (as read) -> procedures reading it
+        self.callers: Dict[str, Set[str]] = {} # callee (as called) -> procedures calling it
+        self._call_spellings: Dict[str, Set[str]] = {} # lowercased callee -> callee names as called
+        self.bodies: Dict[str, BodySummary] = {} # span hash -> summary, see SKMBuilder
+
+    @property
+    def call_graph(self) -> nx.DiGraph:
+        """networkx view of compact_call_graph, built on demand."""
+        return self.compact_call_graph.to_networkx()
 
     def add_variable(self, var: VariableInfo):
-        self.variables[f"{var.scope}.{var.name}"] = var
+        key = f"{var.scope}.{var.name}"
+        self.variables[key] = var
+        self.variable_names.add(key)
+
+    def resolve_procedure(self, name: str) -> Set[str]:
+        """Qualified procedures that `name` (simple or partially qualified) may denote."""
+        return self.procedure_names.resolve(name)
+
+    def resolve_variable(self, name: str) -> Set[str]:
+        """Qualified variables that `name` (simple or partially qualified) may denote."""
+        return self.variable_names.resolve(name)
+
+    def callers_of(self, qualified: str) -> Dict[str, Set[str]]:
+        """Procedures calling `qualified` under any of its names -> the names they used."""
+        found: Dict[str, Set[str]] = {}
+        for suffix in suffixes(qualified):
+            for callee in self._call_spellings.get(suffix, ()):
+                for caller in self.callers[callee]:
+                    found.setdefault(caller, set()).add(callee)
+        return found
 
     def add_procedure(self, proc: ProcedureInfo):
         if proc.name in self.procedures:
@@ -52,9 +106,41 @@ class SystemKnowledgeModel:
 
             # Complexity: max?
             existing.cyclomatic_complexity = max(existing.cyclomatic_complexity, proc.cyclomatic_complexity)
+            existing.invalidate_fingerprint()
         else:
             self.procedures[proc.name] = proc
-            self.call_graph.add_node(proc.name, type="procedure")
+            self.procedure_names.add(proc.name)
+            self.compact_call_graph.add_node(proc.name, kind="procedure")
+        self._index(proc.name, proc)
+
+    def _index(self, name: str, proc: ProcedureInfo):
+        for var in proc.written_vars:
+            self.writers.setdefault(var, set()).add(name)
+        for var in proc.read_vars:
+            self.readers.setdefault(var, set()).add(name)
+        for callee in proc.calls:
+            self._index_call(name, callee)
+
+    def _index_call(self, caller: str, callee: str):
+        callers = self.callers.get(callee)
+        if callers is None:
+            callers = self.callers[callee] = set()
+            self._call_spellings.setdefault(callee.lower(), set()).add(callee)
+        callers.add(caller)
+
+    def add_write(self, proc: ProcedureInfo, var: str):
+        proc.written_vars.add(var)
+        proc.invalidate_fingerprint()
+        # Only the registered ProcedureInfo is indexed; a duplicate merged
+        # by add_procedure keeps its later writes to itself.
+        if self.procedures.get(proc.name) is proc:
+            self.writers.setdefault(var, set()).add(proc.name)
+
+    def add_read(self, proc: ProcedureInfo, var: str):
+        proc.read_vars.add(var)
+        proc.invalidate_fingerprint()
+        if self.procedures.get(proc.name) is proc:
+            self.readers.setdefault(var, set()).add(proc.name)
 
     def add_call(self, caller: str, callee: str, line: int = 0):
         if caller in self.procedures: # Callee might not be parsed yet
@@ -63,8 +149,10 @@ class SystemKnowledgeModel:
              if callee not in proc.call_locations:
                  proc.call_locations[callee] = []
              proc.call_locations[callee].append(line)
+             proc.invalidate_fingerprint()
+             self._index_call(caller, callee)
              
-             self.call_graph.add_edge(caller, callee, lines=proc.call_locations[callee])
+             self.compact_call_graph.add_call(caller, callee, line)
 
     def finalize_dependencies(self):
         """Builds data dependency graph based on reads/writes."""
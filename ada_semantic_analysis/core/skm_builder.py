@@ -1,42 +1,106 @@
 from .ast_nodes import *
-from .skm import SystemKnowledgeModel, VariableInfo, ProcedureInfo
+from .skm import SystemKnowledgeModel, VariableInfo, ProcedureInfo, BodySummary
+from .structural_hash import node_hash, body_hash, digests_body_hash
+from functools import partial
+from typing import Callable, Dict, Set
+
+def _node_classes(cls: type) -> List[type]:
+    """`cls` and all its subclasses."""
+    found = [cls]
+    for sub in cls.__subclasses__():
+        found.extend(_node_classes(sub))
+    return found
 
 class SKMBuilder:
-    def __init__(self, skm: SystemKnowledgeModel):
+    """
+    Adds compilation units to a SystemKnowledgeModel.
+
+    The statements of a lazily parsed body (LazyStatements) are summarized
+    into skm.bodies by span hash as they are visited. With a `baseline`
+    SKM, a body whose span hash it has summarized is replayed from that
+    summary, its lines moved along with the body, and is never parsed.
+    Every other lazy body of a unit is parsed before the unit adds anything,
+    so a unit with a body that fails to parse leaves the SKM untouched.
+
+    The walk is iterative, so nesting depth is not bounded by the
+    recursion limit. A visit_<NodeClass> method (looked up once per builder
+    class, see dispatch_table) does its work when the walk enters the node
+    and returns what to walk next, in order: child nodes, and callables
+    run when the walk reaches them, e.g. to leave a scope.
+    """
+    def __init__(self, skm: SystemKnowledgeModel, baseline: Optional[SystemKnowledgeModel] = None):
         self.skm = skm
+        self.baseline = baseline
         self.current_scope = [] # stack of scope names
         self.current_proc: Optional[ProcedureInfo] = None
+        self.contributed: Set[str] = set() # procedures touched by the last build()
+        self._summary: Optional[BodySummary] = None # of the lazy body being visited
+        self._outer_summaries: List[Optional[BodySummary]] = []
 
-    def build(self, unit: CompilationUnitNode):
+    def build(self, unit: CompilationUnitNode) -> Set[str]:
+        """Adds the unit to the SKM. Returns the names of the procedures it contributed."""
+        self.contributed = set()
         for file_node in unit.files:
-            self.visit(file_node)
+            self._prepare_bodies(file_node)
+        scope, proc = list(self.current_scope), self.current_proc
+        try:
+            for file_node in unit.files:
+                self.visit(file_node)
+        finally:
+            # A failed walk (e.g. a lazy body that does not parse) must not
+            # leave its scope to the next unit.
+            self.current_scope, self.current_proc = scope, proc
+            self._summary, self._outer_summaries = None, []
+        return self.contributed
+
+    @classmethod
+    def dispatch_table(cls) -> Dict[type, Callable]:
+        """Node class -> visit method of this builder class, built on first use."""
+        table = cls.__dict__.get("_dispatch")
+        if table is None:
+            table = {node_cls: cls._visitor(node_cls) for node_cls in _node_classes(ASTNode)}
+            cls._dispatch = table
+        return table
+
+    @classmethod
+    def _visitor(cls, node_cls: type) -> Callable:
+        return getattr(cls, f'visit_{node_cls.__name__}', cls.generic_visit)
 
     def visit(self, node: ASTNode):
-        method_name = f'visit_{type(node).__name__}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+        """Walks the subtree of `node` depth first, with an explicit stack."""
+        dispatch = self.dispatch_table()
+        stack = [node]
+        while stack:
+            item = stack.pop()
+            visitor = dispatch.get(type(item))
+            if visitor is None:
+                if not isinstance(item, ASTNode):
+                    item()
+                    continue
+                # A node class defined after the table was built
+                visitor = dispatch[type(item)] = self._visitor(type(item))
+            then = visitor(self, item)
+            if then:
+                then.reverse()
+                stack += then
 
-    def generic_visit(self, node: ASTNode):
+    def generic_visit(self, node: ASTNode) -> List[ASTNode]:
         # Default: visit all children that are ASTNodes or lists of ASTNodes
-        for field, value in node.__dict__.items():
-            if isinstance(value, list):
-                for item in value:
-                    if isinstance(item, ASTNode):
-                        self.visit(item)
+        children = []
+        for name in child_fields(type(node)):
+            value = getattr(node, name)
+            if isinstance(value, (list, LazyStatements)):
+                children += [item for item in value if isinstance(item, ASTNode)]
             elif isinstance(value, ASTNode):
-                self.visit(value)
+                children.append(value)
+        return children
 
     def get_scope_name(self):
         return ".".join(self.current_scope) if self.current_scope else ""
 
     def visit_PackageNode(self, node: PackageNode):
         self.current_scope.append(node.name)
-        for decl in node.declarations:
-            self.visit(decl)
-        if node.body:
-            for stmt in node.body:
-                self.visit(stmt)
-        self.current_scope.pop()
+        return [*node.declarations, *(node.body or ()), self.current_scope.pop]
 
     def visit_SubprogramNode(self, node: SubprogramNode):
         scope = self.get_scope_name()
@@ -44,11 +108,19 @@ class SKMBuilder:
         
         # Create ProcedureInfo
         # Compute Structural Body Hash
-        # (Naive serialization of statements for logic comparison)
-        # INCLUDE DECLARATIONS IN HASH
-        body_str = str([str(d) for d in node.declarations]) + str([str(s) for s in node.statements]) 
-        import hashlib
-        body_hash = hashlib.md5(body_str.encode()).hexdigest()
+        # Merkle-style: children are hashed once and reused by every
+        # enclosing subprogram. INCLUDE DECLARATIONS IN HASH
+        statements = node.statements
+        summary = None
+        if isinstance(statements, LazyStatements) and self.baseline is not None:
+            summary = self.baseline.bodies.get(statements.span_hash)
+        if summary is not None:
+            statement_hashes = list(summary.statement_hashes)
+            hashed_body = digests_body_hash([node_hash(d) for d in node.declarations],
+                                            [bytes.fromhex(h) for h in statement_hashes])
+        else:
+            statement_hashes = [node_hash(s).hex() for s in statements]
+            hashed_body = body_hash(node.declarations, statements)
 
         proc_info = ProcedureInfo(
             name=full_name,
@@ -57,9 +129,11 @@ class SKMBuilder:
             end_line=0,
             inputs=[p.name for p in node.parameters if "in" in p.mode],
             outputs=[p.name for p in node.parameters if "out" in p.mode],
-            body_hash=body_hash
+            body_hash=hashed_body,
+            statement_hashes=statement_hashes
         )
         self.skm.add_procedure(proc_info)
+        self.contributed.add(full_name)
         
         parent_proc = self.current_proc
         self.current_proc = proc_info
@@ -76,17 +150,64 @@ class SKMBuilder:
             )
             self.skm.add_variable(var_info)
 
-        # Declarations
-        for decl in node.declarations:
-            self.visit(decl)
-
-        # Body statements
-        for stmt in node.statements:
-            self.visit(stmt)
+        # Declarations, then body statements
+        then = list(node.declarations)
+        if summary is not None:
+            then.append(partial(self._replay, proc_info, summary, statements))
+        else:
+            then.append(partial(self._enter_body, statements, statement_hashes))
+            then.extend(statements)
+            then.append(partial(self._leave_body, statements))
+        then.append(partial(self._leave_subprogram, parent_proc))
+        return then
 
+    def _leave_subprogram(self, parent_proc: Optional[ProcedureInfo]):
         self.current_scope.pop()
         self.current_proc = parent_proc
 
+    def _enter_body(self, statements, statement_hashes: List[str]):
+        """Starts the summary of a lazy body's statements (see BodySummary)."""
+        self._outer_summaries.append(self._summary)
+        self._summary = None
+        if isinstance(statements, LazyStatements):
+            self._summary = BodySummary(line=statements.line, statement_hashes=statement_hashes)
+
+    def _leave_body(self, statements):
+        if self._summary is not None:
+            self.skm.bodies[statements.span_hash] = self._summary
+        self._summary = self._outer_summaries.pop()
+
+    def _prepare_bodies(self, node: ASTNode):
+        """
+        Gives the lazy bodies the baseline has summarized their statement
+        digests, so hashing an enclosing subprogram does not parse them, and
+        parses the others, so that one failing to parse raises before
+        anything is added.
+        """
+        if isinstance(node, SubprogramNode):
+            statements = node.statements
+            if isinstance(statements, LazyStatements) and not statements.expanded:
+                summary = self.baseline.bodies.get(statements.span_hash) if self.baseline is not None else None
+                if summary is not None:
+                    statements.digests = [bytes.fromhex(h) for h in summary.statement_hashes]
+                else:
+                    statements.statements
+        if isinstance(node, (PackageNode, SubprogramNode)):
+            for decl in node.declarations:
+                self._prepare_bodies(decl)
+
+    def _replay(self, proc: ProcedureInfo, summary: BodySummary, statements: LazyStatements):
+        """Adds what a summarized body contributes, as visiting its statements would."""
+        line_delta = statements.line - summary.line
+        for callee, line in summary.calls:
+            self.skm.add_call(proc.name, callee, line=line + line_delta)
+        for var in summary.writes:
+            self.skm.add_write(proc, var)
+        if summary.decisions:
+            proc.cyclomatic_complexity += summary.decisions
+            proc.invalidate_fingerprint()
+        self.skm.bodies[statements.span_hash] = summary
+
     def visit_VariableDeclNode(self, node: VariableDeclNode):
         scope = self.get_scope_name()
         for name in node.names:
@@ -104,7 +225,9 @@ class SKMBuilder:
             # Simple heuristic: identifying variable writes
             # Need to resolve scope? For now just store the name
             # Ideally we resolve "X" to "Global.Package.X"
-            self.current_proc.written_vars.add(node.target)
+            self.skm.add_write(self.current_proc, node.target)
+            if self._summary is not None:
+                self._summary.writes.append(node.target)
             
             # Reads in expression?
             # Basic analysis: finding tokens in expression that match var names
@@ -122,15 +245,23 @@ class SKMBuilder:
         # Try to resolve based on USE clauses? 
         # For now, just store as is.
         self.skm.add_call(caller, callee, line=node.line)
+        if self._summary is not None:
+            self._summary.calls.append((callee, node.line))
     
     def visit_IfNode(self, node: IfNode):
         if self.current_proc:
             self.current_proc.cyclomatic_complexity += 1
+            self.current_proc.invalidate_fingerprint()
+            if self._summary is not None:
+                self._summary.decisions += 1
             # Check condition for reads
             
-        self.generic_visit(node) # visit blocks
+        return self.generic_visit(node) # visit blocks
 
     def visit_LoopNode(self, node: LoopNode):
         if self.current_proc:
             self.current_proc.cyclomatic_complexity += 1
-        self.generic_visit(node)
+            self.current_proc.invalidate_fingerprint()
+            if self._summary is not None:
+                self._summary.decisions += 1
+        return self.generic_visit(node)
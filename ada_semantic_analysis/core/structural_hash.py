@@ -0,0 +1,95 @@
+import hashlib
+from dataclasses import fields
+from functools import lru_cache
+from typing import List, Tuple
+from .ast_nodes import ASTNode, LazyStatements, child_fields
+
+# Positions are not structure: a procedure that merely moved must hash the same.
+_EXCLUDED_FIELDS = {"line", "struct_hash"}
+
+@lru_cache(maxsize=None)
+def _hashed_fields(cls) -> Tuple[str, ...]:
+    return tuple(f.name for f in fields(cls) if f.name not in _EXCLUDED_FIELDS)
+
+def node_hash(node: ASTNode) -> bytes:
+    """
+    Returns the structural (Merkle) digest of an AST node.
+
+    The digest covers the node type and every field except positions; child
+    nodes contribute their own digest rather than their text. Digests are
+    memoized on the node, so a subtree is hashed once no matter how many
+    enclosing nodes include it. Children are hashed first from an explicit
+    stack, so deep nesting does not recurse.
+    """
+    if node.struct_hash is not None:
+        return node.struct_hash
+
+    stack = [node]
+    while stack:
+        top = stack[-1]
+        pending = [child for child in _children(top) if child.struct_hash is None]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        if top.struct_hash is None:
+            top.struct_hash = _digest(top)
+    return node.struct_hash
+
+def _children(node: ASTNode) -> List[ASTNode]:
+    children = []
+    for name in child_fields(type(node)):
+        value = getattr(node, name)
+        if isinstance(value, ASTNode):
+            children.append(value)
+        elif isinstance(value, LazyStatements) and not value.expanded and value.digests is not None:
+            continue
+        elif isinstance(value, (list, LazyStatements)):
+            children.extend(item for item in value if isinstance(item, ASTNode))
+    return children
+
+def _digest(node: ASTNode) -> bytes:
+    """The digest of a node whose children are hashed already."""
+    h = hashlib.md5(type(node).__name__.encode())
+    for name in _hashed_fields(type(node)):
+        h.update(b"\x00" + name.encode() + b"=")
+        _update(h, getattr(node, name))
+    return h.digest()
+
+def _update(h, value):
+    if isinstance(value, ASTNode):
+        h.update(b"N")
+        h.update(node_hash(value))
+    elif isinstance(value, LazyStatements) and not value.expanded and value.digests is not None:
+        # Same encoding as the list of statements
+        h.update(b"[%d:" % len(value.digests))
+        for digest in value.digests:
+            h.update(b"N")
+            h.update(digest)
+        h.update(b"]")
+    elif isinstance(value, (list, LazyStatements)):
+        h.update(b"[%d:" % len(value))
+        for item in value:
+            _update(h, item)
+        h.update(b"]")
+    elif value is None:
+        h.update(b"-")
+    else:
+        # Length-prefixed so adjacent strings cannot run into each other.
+        data = str(value).encode()
+        h.update(b"S%d:" % len(data))
+        h.update(data)
+
+def body_hash(declarations, statements) -> str:
+    """Hex digest of a subprogram body, built from the children's digests."""
+    return digests_body_hash([node_hash(d) for d in declarations], [node_hash(s) for s in statements])
+
+def digests_body_hash(declaration_digests: List[bytes], statement_digests: List[bytes]) -> str:
+    """body_hash() from the node_hash digests of the declarations and statements."""
+    h = hashlib.md5()
+    for digest in declaration_digests:
+        h.update(digest)
+    h.update(b"|")
+    for digest in statement_digests:
+        h.update(digest)
+    return h.hexdigest()
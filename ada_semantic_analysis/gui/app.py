@@ -3,17 +3,21 @@ from tkinter import ttk, filedialog, messagebox
 import os
 import threading
 import json
-from ..core.lexer import AdaLexer
-from ..core.parser import AdaParser
 from ..core.skm import SystemKnowledgeModel
-from ..core.skm_builder import SKMBuilder
+from ..core.ingestion import ParallelIngestor
+from ..core.parse_cache import ParseCache
 from ..comparison.differ import SemanticDiffer
 from ..comparison.invariant_checker import LegacyInvariantChecker
 from ..reporting.pdf_generator import PDFReportGenerator
 
 class AdaAnalysisApp:
-    def __init__(self, root):
+    def __init__(self, root, max_workers=None, use_cache=True):
         self.root = root
+        self.max_workers = max_workers # None: one parser process per CPU
+        self.parse_cache = ParseCache() if use_cache else None
+        # Files parsed in-process, kept parsed so the next run re-parses
+        # only around the edits (see ParallelIngestor)
+        self.documents = {}
         self.root.title("Ada TF-IDF Change + Impact Analyzer (Categorical + PDF)") # Matching image title
         self.root.geometry("1100x800")
         
@@ -179,15 +183,15 @@ class AdaAnalysisApp:
 
     def _run_analysis_logic(self, p1, p2):
         try:
-            skm1 = self._process_directory(p1, "Baseline")
-            skm2 = self._process_directory(p2, "Modified")
+            ingestor = self._make_ingestor()
+            skm1, skm2, unchanged = ingestor.ingest_pair(p1, p2)
             
-            differ = SemanticDiffer(skm1, skm2)
+            differ = SemanticDiffer(skm1, skm2, unchanged_procedures=unchanged)
             self.changes = differ.diff()
             
             # Invariant Checking
             checker = LegacyInvariantChecker(skm1, skm2)
-            self.invariant_violations = checker.check()
+            self.invariant_violations = checker.check(differ.changed_procedures)
             
             # Compute metrics
             high = sum(1 for c in self.changes if c.risk == "High")
@@ -227,25 +231,13 @@ class AdaAnalysisApp:
             traceback.print_exc()
             self.root.after(0, lambda: self._analysis_failed(str(e)))
             
+    def _make_ingestor(self) -> ParallelIngestor:
+        # Both trees share one process pool; files are parsed in parallel and
+        # merged into each SKM in a deterministic order.
+        return ParallelIngestor(max_workers=self.max_workers, cache=self.parse_cache, documents=self.documents)
+
     def _process_directory(self, path, name) -> SystemKnowledgeModel:
-        skm = SystemKnowledgeModel(name)
-        builder = SKMBuilder(skm)
-        
-        for root, dirs, files in os.walk(path):
-            for f in files:
-                if f.lower().endswith(('.adb', '.ads', '.ada')):
-                    full_path = os.path.join(root, f)
-                    try:
-                        with open(full_path, 'r', encoding='utf-8', errors='ignore') as fh:
-                            code = fh.read()
-                        
-                        lexer = AdaLexer(code)
-                        parser = AdaParser(lexer)
-                        unit = parser.parse_compilation_unit()
-                        builder.build(unit)
-                    except Exception as e:
-                        print(f"Error parsing {f}: {e}")
-        return skm
+        return self._make_ingestor().ingest(path, name)
 
     def _analysis_complete(self):
         self.status.set(f"Analysis Complete. {len(self.changes)} changes, {len(self.invariant_violations)} compliance violations.")
@@ -0,0 +1,66 @@
+import os
+import sys
+import tracemalloc
+from dataclasses import fields
+from functools import lru_cache
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ada_semantic_analysis.core.ast_nodes import ASTNode, LazyStatements
+from ada_semantic_analysis.core.lexer import AdaLexer
+from ada_semantic_analysis.core.parser import AdaParser
+from bench_token_memory import load_corpus
+
+@lru_cache(maxsize=None)
+def dict_twin(cls):
+    """A plain class laid out like `cls` before slots: attributes in a per-instance __dict__."""
+    names = [f.name for f in fields(cls)]
+    def __init__(self, **values):
+        for name in names:
+            setattr(self, name, values[name])
+    return type(cls.__name__, (), {"__init__": __init__})
+
+def copy_tree(value, make):
+    """Rebuilds the nodes of a tree with make(cls, field values); other values are shared."""
+    if isinstance(value, ASTNode):
+        return make(type(value), {f.name: copy_tree(getattr(value, f.name), make) for f in fields(value)})
+    if isinstance(value, (list, LazyStatements)):
+        return [copy_tree(item, make) for item in value]
+    return value
+
+def count_nodes(value) -> int:
+    if isinstance(value, ASTNode):
+        return 1 + sum(count_nodes(getattr(value, f.name)) for f in fields(value))
+    if isinstance(value, list):
+        return sum(count_nodes(item) for item in value)
+    return 0
+
+def retained(units, make) -> int:
+    """Bytes allocated by a copy of every unit built with `make`."""
+    tracemalloc.start()
+    copies = [copy_tree(unit, make) for unit in units]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del copies
+    return size
+
+def main():
+    here = os.path.dirname(os.path.abspath(__file__))
+    sources = load_corpus([os.path.join(here, "stress_v1"), os.path.join(here, "stress_v2")])
+    units = []
+    for code in sources:
+        try:
+            units.append(AdaParser(AdaLexer(code)).parse_compilation_unit())
+        except Exception:
+            pass
+    nodes = sum(map(count_nodes, units))
+    print(f"Corpus: {len(units)} units, {nodes} AST nodes")
+
+    for label, make in (("__dict__ nodes", lambda cls, values: dict_twin(cls)(**values)),
+                        ("slotted nodes", lambda cls, values: cls(**values))):
+        size = retained(units, make)
+        print(f"{label:>14}: {size / 1e6:.1f} MB, {size / nodes:.0f} bytes/node (lists included)")
+
+if __name__ == "__main__":
+    main()
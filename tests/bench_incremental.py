@@ -0,0 +1,35 @@
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ada_semantic_analysis.core.incremental import IncrementalDocument
+from ada_semantic_analysis.core.lexer import AdaLexer
+from ada_semantic_analysis.core.parser import AdaParser
+from bench_streaming import generate_unit
+
+def main():
+    code = generate_unit(5000)
+    print(f"Unit: {len(code) / 1e6:.1f} MB")
+
+    start = time.perf_counter()
+    AdaParser(AdaLexer(code)).parse_compilation_unit()
+    print(f"Full parse:        {time.perf_counter() - start:.3f}s")
+
+    doc = IncrementalDocument(code)
+    edits = 20
+    start = time.perf_counter()
+    for i in range(edits):
+        # One statement added in a different procedure each time
+        at = doc.source.index("begin", len(doc.source) * i // edits) + len("begin")
+        doc.edit(at, at, "\n      X := X + 1;")
+    duration = (time.perf_counter() - start) / edits
+    print(f"Incremental edit:  {duration:.3f}s ({doc.relexed} tokens re-lexed, {doc.reparsed} items re-parsed)")
+
+    expected = AdaParser(AdaLexer(doc.source)).parse_compilation_unit()
+    print(f"Matches a full parse: {doc.unit == expected}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ada_semantic_analysis.core.lexer import AdaLexer
+from ada_semantic_analysis.core.parser import AdaParser
+from ada_semantic_analysis.core.skm import SystemKnowledgeModel
+from ada_semantic_analysis.core.skm_builder import SKMBuilder
+from bench_streaming import generate_unit
+
+def build(code, name, lazy, baseline=None):
+    """Returns the SKM with the parse and SKM build times (lexing excluded)."""
+    skm = SystemKnowledgeModel(name)
+    parser = AdaParser(AdaLexer(code), compact=True, lazy_bodies=lazy)
+    start = time.perf_counter()
+    unit = parser.parse_compilation_unit()
+    parsed = time.perf_counter()
+    SKMBuilder(skm, baseline).build(unit)
+    return skm, parsed - start, time.perf_counter() - parsed
+
+def main():
+    baseline_code = generate_unit(5000)
+    # One body edited, everything below it moved down a line
+    modified_code = baseline_code.replace("X := 0;\n", "X := 0;\n         Reset;\n", 1)
+    print(f"Unit: {len(modified_code) / 1e6:.1f} MB")
+
+    eager_base, _, _ = build(baseline_code, "V1", lazy=False)
+    eager, parsed, built = build(modified_code, "V2", lazy=False)
+    print(f"Eager:              parse {parsed:.3f}s, SKM {built:.3f}s")
+
+    lazy_base, _, _ = build(baseline_code, "V1", lazy=True)
+    lazy, parsed, built = build(modified_code, "V2", lazy=True, baseline=lazy_base)
+    print(f"Lazy with baseline: parse {parsed:.3f}s, SKM {built:.3f}s")
+
+    same = all(lazy.procedures[n] == p for n, p in eager.procedures.items())
+    print(f"Same SKM: {same and lazy.procedures.keys() == eager.procedures.keys()}")
+
+if __name__ == "__main__":
+    main()
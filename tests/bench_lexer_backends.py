@@ -0,0 +1,30 @@
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ada_semantic_analysis.core.lexer import AdaLexer
+from bench_token_memory import load_corpus
+
+def main():
+    here = os.path.dirname(os.path.abspath(__file__))
+    sources = load_corpus([os.path.join(here, "stress_v1"), os.path.join(here, "stress_v2")])
+    print(f"Corpus: {len(sources)} files, {sum(map(len, sources)) / 1e6:.1f} MB")
+    reference = None
+    for backend in AdaLexer.BACKENDS:
+        for label, tokenize in (("tokens", AdaLexer.tokenize), ("compact", AdaLexer.tokenize_compact)):
+            start = time.perf_counter()
+            results = [tokenize(AdaLexer(code, backend=backend)) for code in sources]
+            duration = time.perf_counter() - start
+            count = sum(len(r) for r in results)
+            print(f"{backend:>6} {label:>7}: {count} tokens in {duration:.2f}s, {count / duration / 1e6:.2f}M tokens/sec")
+            if label == "tokens":
+                if reference is None:
+                    reference = results
+                elif results != reference:
+                    print(f"{backend:>6}: token stream differs from {AdaLexer.BACKENDS[0]}")
+
+if __name__ == "__main__":
+    main()
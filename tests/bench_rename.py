@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import random
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ada_semantic_analysis.core.skm import SystemKnowledgeModel, ProcedureInfo
+from ada_semantic_analysis.comparison.differ import SemanticDiffer
+
+PARAMS = ["Input", "Mode", "Limit", "Gain", "Offset", "Channel"]
+
+def make_proc(name, rng):
+    proc = ProcedureInfo(
+        name=name,
+        signature=f"procedure {name.split('.')[-1]}",
+        start_line=0,
+        end_line=0,
+        inputs=sorted(rng.sample(PARAMS, rng.randint(0, 3))),
+        outputs=sorted(rng.sample(["Result", "Status"], rng.randint(0, 1))),
+    )
+    proc.cyclomatic_complexity = rng.randint(1, 40)
+    proc.calls.update(f"Helper_{rng.randint(0, 50)}" for _ in range(rng.randint(0, 4)))
+    return proc
+
+def build_models(count, seed=42):
+    """Two SKMs sharing nothing: `count` procedures removed, `count` added."""
+    rng = random.Random(seed)
+    old = SystemKnowledgeModel("V1")
+    new = SystemKnowledgeModel("V2")
+    for i in range(count):
+        old.add_procedure(make_proc(f"Legacy_Pkg_{i % 97:02d}.Proc_{i:05d}", rng))
+        new.add_procedure(make_proc(f"Moved_Pkg_{i % 89:02d}.Proc_{i:05d}_V2", rng))
+    return old, new
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print(f"Building {count} removed and {count} added procedures...")
+    old, new = build_models(count)
+
+    start = time.time()
+    changes = SemanticDiffer(old, new).diff()
+    duration = time.time() - start
+
+    renames = sum(1 for c in changes if "Renamed" in c.classification)
+    print(f"Differ finished in {duration:.4f} seconds.")
+    print(f"Renames: {renames}, Added/Removed left: {len(changes) - renames}")
+
+if __name__ == "__main__":
+    main()
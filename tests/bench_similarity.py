@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+import random
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ada_semantic_analysis.core.skm import SystemKnowledgeModel, ProcedureInfo
+from ada_semantic_analysis.comparison.differ import SemanticDiffer
+
+def make_proc(name, rng):
+    proc = ProcedureInfo(name, f"procedure {name.split('.')[-1]}", 0, 0, ["Input"], [])
+    proc.calls.update(f"Service_{rng.randint(0, 5000)}" for _ in range(rng.randint(2, 6)))
+    proc.written_vars.update(f"State_{rng.randint(0, 2000)}" for _ in range(rng.randint(1, 3)))
+    proc.statement_hashes = [f"{rng.getrandbits(64):016x}" for _ in range(rng.randint(3, 12))]
+    proc.cyclomatic_complexity = rng.randint(1, 20)
+    return proc
+
+def build_models(count, renamed_ratio=0.2, seed=42):
+    """
+    `count` procedures per version. A share of them is renamed in V2 and
+    lightly edited (one statement replaced, sometimes a call added).
+    """
+    rng = random.Random(seed)
+    old = SystemKnowledgeModel("V1")
+    new = SystemKnowledgeModel("V2")
+    for i in range(count):
+        name = f"Pkg_{i % 500:03d}.Proc_{i:06d}"
+        p_old = make_proc(name, rng)
+        old.add_procedure(p_old)
+
+        if rng.random() >= renamed_ratio:
+            new.add_procedure(p_old)
+            continue
+        p_new = ProcedureInfo(name + "_Renamed", p_old.signature, 0, 0, list(p_old.inputs), [])
+        p_new.calls = set(p_old.calls)
+        p_new.written_vars = set(p_old.written_vars)
+        p_new.statement_hashes = list(p_old.statement_hashes)
+        p_new.statement_hashes[-1] = f"{rng.getrandbits(64):016x}"
+        if rng.random() < 0.5:
+            p_new.calls.add("Trace_Hook")
+        p_new.cyclomatic_complexity = p_old.cyclomatic_complexity
+        new.add_procedure(p_new)
+    return old, new
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    print(f"Building two systems of {count} procedures...")
+    old, new = build_models(count)
+    expected = {n for n in old.procedures if n not in new.procedures}
+
+    start = time.time()
+    changes = SemanticDiffer(old, new, similarity_threshold=0.75).diff()
+    duration = time.time() - start
+
+    correct = 0
+    renames = [c for c in changes if "Renamed" in c.classification]
+    for c in renames:
+        pair = c.classification[len("Renamed Procedure ("):].split(",")[0].rstrip(")")
+        r_name, a_name = pair.split(" -> ")
+        correct += a_name == r_name + "_Renamed"
+    print(f"Differ finished in {duration:.4f} seconds.")
+    print(f"Renamed procedures: {len(expected)}, detected: {len(renames)}, correctly paired: {correct}")
+
+if __name__ == "__main__":
+    main()
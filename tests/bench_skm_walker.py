@@ -0,0 +1,163 @@
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ada_semantic_analysis.core.ast_nodes import *
+from ada_semantic_analysis.core.skm import SystemKnowledgeModel, VariableInfo, ProcedureInfo, BodySummary
+from ada_semantic_analysis.core.skm_builder import SKMBuilder
+from ada_semantic_analysis.core.structural_hash import node_hash, body_hash, digests_body_hash
+
+class RecursiveSKMBuilder(SKMBuilder):
+    """
+    The previous walk, as it was before the dispatch table: a visit_<name>
+    getattr per node, one Python call per level, and visitors that recurse
+    into their children themselves.
+    """
+    def build(self, unit: CompilationUnitNode):
+        self.contributed = set()
+        for file_node in unit.files:
+            self.visit(file_node)
+        return self.contributed
+
+    def visit(self, node: ASTNode):
+        method_name = f'visit_{type(node).__name__}'
+        visitor = getattr(self, method_name, self.generic_visit)
+        return visitor(node)
+
+    def generic_visit(self, node: ASTNode):
+        for name in child_fields(type(node)):
+            value = getattr(node, name)
+            if isinstance(value, (list, LazyStatements)):
+                for item in value:
+                    if isinstance(item, ASTNode):
+                        self.visit(item)
+            elif isinstance(value, ASTNode):
+                self.visit(value)
+
+    def visit_PackageNode(self, node: PackageNode):
+        self.current_scope.append(node.name)
+        for decl in node.declarations:
+            self.visit(decl)
+        if node.body:
+            for stmt in node.body:
+                self.visit(stmt)
+        self.current_scope.pop()
+
+    def visit_SubprogramNode(self, node: SubprogramNode):
+        scope = self.get_scope_name()
+        full_name = f"{scope}.{node.name}" if scope else node.name
+        statements = node.statements
+        summary = None
+        if isinstance(statements, LazyStatements) and self.baseline is not None:
+            summary = self.baseline.bodies.get(statements.span_hash)
+        if summary is not None:
+            statement_hashes = list(summary.statement_hashes)
+            hashed_body = digests_body_hash([node_hash(d) for d in node.declarations],
+                                            [bytes.fromhex(h) for h in statement_hashes])
+        else:
+            statement_hashes = [node_hash(s).hex() for s in statements]
+            hashed_body = body_hash(node.declarations, statements)
+
+        proc_info = ProcedureInfo(
+            name=full_name,
+            signature=f"{node.kind} {node.name}",
+            start_line=0,
+            end_line=0,
+            inputs=[p.name for p in node.parameters if "in" in p.mode],
+            outputs=[p.name for p in node.parameters if "out" in p.mode],
+            body_hash=hashed_body,
+            statement_hashes=statement_hashes
+        )
+        self.skm.add_procedure(proc_info)
+        self.contributed.add(full_name)
+
+        parent_proc = self.current_proc
+        self.current_proc = proc_info
+        self.current_scope.append(node.name)
+
+        for param in node.parameters:
+            self.skm.add_variable(VariableInfo(name=param.name, type_name=param.type_name, scope=full_name,
+                                               kind="parameter", defined_at_line=0))
+
+        for decl in node.declarations:
+            self.visit(decl)
+
+        if summary is not None:
+            self._replay(proc_info, summary, statements)
+        else:
+            outer_summary = self._summary
+            self._summary = None
+            if isinstance(statements, LazyStatements):
+                self._summary = BodySummary(line=statements.line, statement_hashes=statement_hashes)
+            for stmt in statements:
+                self.visit(stmt)
+            if self._summary is not None:
+                self.skm.bodies[statements.span_hash] = self._summary
+            self._summary = outer_summary
+
+        self.current_scope.pop()
+        self.current_proc = parent_proc
+
+    def visit_IfNode(self, node: IfNode):
+        if self.current_proc:
+            self.current_proc.cyclomatic_complexity += 1
+            self.current_proc.invalidate_fingerprint()
+            if self._summary is not None:
+                self._summary.decisions += 1
+        self.generic_visit(node)
+
+    def visit_LoopNode(self, node: LoopNode):
+        if self.current_proc:
+            self.current_proc.cyclomatic_complexity += 1
+            self.current_proc.invalidate_fingerprint()
+            if self._summary is not None:
+                self._summary.decisions += 1
+        self.generic_visit(node)
+
+def nested(depth: int, line: int = 1):
+    """Statements of a generated state machine: case, if and loop nested `depth` deep."""
+    body = [CallNode(name=f"Step_{depth}", arguments=[], line=line),
+            AssignmentNode(target="State", expression=f"{depth}", line=line)]
+    for level in range(depth):
+        kind = level % 3
+        if kind == 0:
+            body = [IfNode(condition=f"State = {level}", then_block=body, else_block=[CallNode(name="Idle", arguments=[], line=line)])]
+        elif kind == 1:
+            body = [CaseNode(expression="Mode", when_parts=[WhenNode(choices=f"{level}", statements=body),
+                                                             WhenNode(choices="others", statements=[])])]
+        else:
+            body = [LoopNode(name=None, iteration_scheme=f"while Busy_{level}", statements=body)]
+    return body
+
+def unit(procs: int, depth: int) -> CompilationUnitNode:
+    subprograms = [SubprogramNode(name=f"Machine_{i}", kind="procedure", statements=nested(depth, i))
+                   for i in range(procs)]
+    return CompilationUnitNode(files=[PackageNode(name="Machines", is_body=True, declarations=subprograms)])
+
+def run(builder_cls, tree) -> float:
+    builder = builder_cls(SystemKnowledgeModel("Bench"))
+    start = time.perf_counter()
+    builder.build(tree)
+    return time.perf_counter() - start
+
+def main(repeat: int = 5):
+    print(f"Recursion limit: {sys.getrecursionlimit()}")
+    for procs, depth in ((2000, 30), (20, 3000)):
+        print(f"{procs} procedures nested {depth} deep (best of {repeat}):")
+        tree = unit(procs, depth)
+        # Memoize the structural hashes up front, so only the walk is timed
+        for sub in tree.files[0].declarations:
+            for stmt in sub.statements:
+                node_hash(stmt)
+        for label, builder_cls in (("recursive getattr", RecursiveSKMBuilder), ("iterative table", SKMBuilder)):
+            try:
+                best = min(run(builder_cls, tree) for _ in range(repeat))
+                print(f"  {label:<18} {best:.3f}s")
+            except RecursionError:
+                print(f"  {label:<18} RecursionError")
+
+if __name__ == "__main__":
+    main()
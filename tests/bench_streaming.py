@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+import tracemalloc
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ada_semantic_analysis.core.lexer import AdaLexer
+from ada_semantic_analysis.core.parser import AdaParser
+
+def generate_unit(procs):
+    """A generated package body in the style of our state-machine sources."""
+    parts = ["package body Generated is"]
+    for i in range(procs):
+        parts.append(f"""
+   procedure Step_{i} (X : in out Integer) is
+      Limit : constant Integer := {i};
+   begin
+      if X > Limit and then X < Limit + 100 then
+         X := X * 2 + Limit - 1;
+         Log_Value (X, Limit);
+      elsif X = Limit then
+         X := 0;
+      end if;
+      while X < Limit loop
+         X := X + 1;
+      end loop;
+   end Step_{i};""")
+    parts.append("end Generated;")
+    return "\n".join(parts)
+
+def measure(code, streaming):
+    tracemalloc.start()
+    start = time.time()
+    parser = AdaParser(AdaLexer(code), streaming=streaming)
+    unit = parser.parse_compilation_unit()
+    duration = time.time() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration, peak, unit
+
+def main():
+    procs = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    code = generate_unit(procs)
+    print(f"Source: {len(code) / 1e6:.1f} MB, {procs} procedures")
+    for streaming in (False, True):
+        duration, peak, unit = measure(code, streaming)
+        label = "streaming" if streaming else "token list"
+        print(f"{label:>10}: {duration:.2f}s, peak {peak / 1e6:.1f} MB above the source")
+        del unit
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ada_semantic_analysis.core.ingestion import collect_sources
+from ada_semantic_analysis.core.lexer import AdaLexer
+from bench_streaming import generate_unit
+
+def load_corpus(dirs):
+    """Sources of the stress_test.py trees (run stress_test.py first if they are missing)."""
+    sources = []
+    for d in dirs:
+        for path in collect_sources(d):
+            with open(path, 'r', encoding='utf-8', errors='ignore') as fh:
+                sources.append(fh.read())
+    return sources
+
+def retained(sources, tokenize):
+    """Bytes still allocated after tokenizing every source, and the token count."""
+    tracemalloc.start()
+    kept = [tokenize(AdaLexer(code)) for code in sources]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, sum(len(k) for k in kept)
+
+def main():
+    here = os.path.dirname(os.path.abspath(__file__))
+    sources = load_corpus([os.path.join(here, "stress_v1"), os.path.join(here, "stress_v2")])
+    print(f"Corpus: {len(sources)} files, {sum(map(len, sources)) / 1e6:.1f} MB")
+    for label, tokenize in (("token list", AdaLexer.tokenize), ("TokenBuffer", AdaLexer.tokenize_compact)):
+        size, count = retained(sources, tokenize)
+        start = time.time()
+        for code in sources:
+            tokenize(AdaLexer(code))
+        duration = time.time() - start
+        print(f"{label:>11}: {count} tokens, {size / count:.1f} bytes/token, tokenized in {duration:.2f}s")
+
+    # One large generated unit: decoded text vs memory-mapped bytes
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "generated.adb")
+        with open(path, "w") as fh:
+            fh.write(generate_unit(20000))
+        print(f"Large unit: {os.path.getsize(path) / 1e6:.1f} MB")
+        for label, load in (("decoded str", lambda: AdaLexer(open(path, encoding='utf-8', errors='ignore').read())),
+                            ("mmap bytes", lambda: AdaLexer.from_file(path))):
+            tracemalloc.start()
+            buf = load().tokenize_compact()
+            size, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{label:>11}: {len(buf)} tokens, retained {size / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB")
+            del buf
+
+if __name__ == "__main__":
+    main()
@@ -7,10 +7,7 @@ import random
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from ada_semantic_analysis.core.lexer import AdaLexer
-from ada_semantic_analysis.core.parser import AdaParser
-from ada_semantic_analysis.core.skm import SystemKnowledgeModel
-from ada_semantic_analysis.core.skm_builder import SKMBuilder
+from ada_semantic_analysis.core.ingestion import ParallelIngestor, collect_sources
 from ada_semantic_analysis.comparison.differ import SemanticDiffer
 
 class AdaCodeGenerator:
@@ -151,26 +148,12 @@ def modify_content_for_v2(lines, file_index):
 
     return new_lines, change_type
 
-def parse_dir(path, name):
-    skm = SystemKnowledgeModel(name)
-    builder = SKMBuilder(skm)
-    file_count = 0
+def parse_dir(path, name, max_workers=None):
     start_time = time.time()
-    
-    for root, dirs, files in os.walk(path):
-        for f in files:
-            if f.endswith('.adb'):
-                file_count += 1
-                with open(os.path.join(root, f), 'r') as fh:
-                    code = fh.read()
-                try:
-                    lexer = AdaLexer(code)
-                    parser = AdaParser(lexer)
-                    unit = parser.parse_compilation_unit()
-                    builder.build(unit)
-                except Exception as e:
-                    print(f"Error parsing {f}: {e}")
-                
+    ingestor = ParallelIngestor(max_workers=max_workers, extensions=('.adb',))
+    file_count = len(collect_sources(path, ingestor.extensions))
+    skm = ingestor.ingest(path, name)
+
     end_time = time.time()
     duration = end_time - start_time
     print(f"[{name}] Parsed {file_count} files in {duration:.4f} seconds.")
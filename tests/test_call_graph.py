@@ -0,0 +1,35 @@
+import unittest
+from ada_semantic_analysis.core.call_graph import CompactCallGraph
+
+class TestCompactCallGraph(unittest.TestCase):
+    def setUp(self):
+        self.g = CompactCallGraph()
+        self.g.add_node("Main", kind="procedure")
+        self.g.add_call("Main", "Helper", 4)
+        self.g.add_call("Main", "Log", 5)
+        self.g.add_call("Main", "Helper", 9)
+        self.g.add_call("Helper", "Log", 12)
+
+    def test_adjacency_and_lines(self):
+        self.assertEqual(self.g.number_of_edges(), 3)
+        self.assertEqual(sorted(self.g.successors("Main")), ["Helper", "Log"])
+        self.assertEqual(sorted(self.g.predecessors("Log")), ["Helper", "Main"])
+        self.assertEqual(self.g.edge_lines("Main", "Helper"), [4, 9])
+        self.assertEqual(self.g.edge_lines("Log", "Main"), [])
+        self.assertFalse(self.g.has_edge("Helper", "Main"))
+        self.assertEqual(self.g.predecessors("Unknown"), [])
+
+    def test_mutation_after_query(self):
+        self.assertEqual(self.g.predecessors("Main"), [])
+        self.g.add_call("Boot", "Main", 1)
+        self.assertEqual(self.g.predecessors("Main"), ["Boot"])
+
+    def test_to_networkx(self):
+        nxg = self.g.to_networkx()
+        self.assertEqual(sorted(nxg.edges), [("Helper", "Log"), ("Main", "Helper"), ("Main", "Log")])
+        self.assertEqual(nxg.edges["Main", "Helper"]["lines"], [4, 9])
+        self.assertEqual(nxg.nodes["Main"]["type"], "procedure")
+        self.assertIs(nxg, self.g.to_networkx())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+from ada_semantic_analysis.core.skm import SystemKnowledgeModel, ProcedureInfo
+from ada_semantic_analysis.core.fingerprinting import BehavioralFingerprint, FingerprintGenerator
+
+class TestFingerprintCache(unittest.TestCase):
+    def setUp(self):
+        self.skm = SystemKnowledgeModel("V1")
+        self.proc = ProcedureInfo("Main", "procedure Main", 1, 10, [], [])
+        self.skm.add_procedure(self.proc)
+
+    def test_fingerprint_is_memoized(self):
+        fp = BehavioralFingerprint.of(self.proc)
+        self.assertIs(fp, BehavioralFingerprint.of(self.proc))
+        self.assertEqual(fp.hash, BehavioralFingerprint(self.proc).hash)
+
+        generated = FingerprintGenerator(self.skm).generate_all()
+        self.assertEqual(generated["Main"]["hash"], fp.hash)
+        self.assertIs(BehavioralFingerprint.of(self.proc), fp)
+
+    def test_add_call_invalidates(self):
+        before = BehavioralFingerprint.of(self.proc).hash
+        self.skm.add_call("Main", "Helper", line=3)
+        after = BehavioralFingerprint.of(self.proc)
+        self.assertNotEqual(before, after.hash)
+        self.assertEqual(after.fingerprint["calls"], ["Helper"])
+
+    def test_add_procedure_merge_invalidates(self):
+        before = BehavioralFingerprint.of(self.proc).hash
+        other = ProcedureInfo("Main", "procedure Main", 1, 10, [], [], written_vars={"Main.X"})
+        self.skm.add_procedure(other)
+        after = BehavioralFingerprint.of(self.proc)
+        self.assertNotEqual(before, after.hash)
+        self.assertEqual(after.fingerprint["writes"], ["Main.X"])
+
+if __name__ == '__main__':
+    unittest.main()
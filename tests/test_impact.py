@@ -0,0 +1,73 @@
+import unittest
+from ada_semantic_analysis.core.lexer import AdaLexer
+from ada_semantic_analysis.core.parser import AdaParser
+from ada_semantic_analysis.core.skm import SystemKnowledgeModel
+from ada_semantic_analysis.core.skm_builder import SKMBuilder
+from ada_semantic_analysis.core.call_graph import CompactCallGraph
+from ada_semantic_analysis.comparison.differ import SemanticDiffer
+from ada_semantic_analysis.comparison.impact import ImpactAnalyzer
+
+CHAIN = """
+package body Ctl is
+   procedure Leaf is begin X := {value}; end Leaf;
+   procedure Mid is begin Leaf; end Mid;
+   procedure Top is begin Mid; end Top;
+   procedure Ping is begin Top; Pong; end Ping;
+   procedure Pong is begin Ping; end Pong;
+end Ctl;
+"""
+
+def build(code, name):
+    skm = SystemKnowledgeModel(name)
+    SKMBuilder(skm).build(AdaParser(AdaLexer(code)).parse_compilation_unit())
+    return skm
+
+class TestImpactAnalyzer(unittest.TestCase):
+    def test_transitive_callers_with_depth(self):
+        analyzer = ImpactAnalyzer(build(CHAIN.format(value=1), "V1").compact_call_graph)
+        self.assertEqual(analyzer.transitive_callers("Ctl.Leaf"), {
+            "Ctl.Mid": 1, "Ctl.Top": 2, "Ctl.Ping": 3, "Ctl.Pong": 3,
+        })
+        self.assertIs(analyzer.transitive_callers("Ctl.Leaf"), analyzer.transitive_callers("Ctl.Leaf"))
+        self.assertEqual(analyzer.direct_callers("Ctl.Mid"), {"Ctl.Top": [5]})
+
+    def test_recursive_component(self):
+        # Above the target's cycle, a cycle is one unit of impact: every member shares its depth.
+        g = CompactCallGraph()
+        for caller, callee in [("A", "B"), ("B", "A"), ("C", "A"), ("D", "C")]:
+            g.add_call(caller, callee)
+        analyzer = ImpactAnalyzer(g)
+        self.assertEqual(analyzer.transitive_callers("A"), {"B": 1, "C": 1, "D": 2})
+        self.assertEqual(analyzer.transitive_callers("B"), {"A": 1, "C": 2, "D": 3})
+
+    def test_depths_inside_the_target_cycle_are_exact(self):
+        g = CompactCallGraph()
+        for caller, callee in [("A", "B"), ("B", "T"), ("T", "A"), ("X", "A"), ("Y", "X")]:
+            g.add_call(caller, callee)
+        self.assertEqual(ImpactAnalyzer(g).transitive_callers("T"), {"B": 1, "A": 2, "X": 3, "Y": 4})
+
+    def test_resolves_qualified_and_case_folded_calls(self):
+        code = """
+package body Nav is
+   procedure Leaf is begin X := 1; end Leaf;
+   procedure A is begin Nav.Leaf; end A;
+   procedure B is begin LEAF; end B;
+end Nav;
+"""
+        skm = build(code, "V1")
+        analyzer = ImpactAnalyzer(skm.compact_call_graph, skm.resolve_procedure)
+        self.assertEqual(sorted(analyzer.direct_callers("Nav.Leaf")), ["Nav.A", "Nav.B"])
+
+    def test_differ_reports_indirect_impact(self):
+        old = build(CHAIN.format(value=1), "V1")
+        new = build(CHAIN.format(value=2), "V2")
+        changes = SemanticDiffer(old, new).diff()
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(changes[0].affected_files.split("\n"), [
+            "Ctl.Mid:4", "Ctl.Top:Depth-2", "Ctl.Ping:Depth-3", "Ctl.Pong:Depth-3",
+        ])
+        limited = SemanticDiffer(old, new, max_impact_depth=2).diff()
+        self.assertEqual(limited[0].affected_files.split("\n"), ["Ctl.Mid:4", "Ctl.Top:Depth-2"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from ada_semantic_analysis.core.incremental import IncrementalDocument, text_edit
+from ada_semantic_analysis.core.ingestion import ParallelIngestor
+from ada_semantic_analysis.core.lexer import AdaLexer
+from ada_semantic_analysis.core.parser import AdaParser
+from ada_semantic_analysis.core.structural_hash import node_hash
+
+CODE = """package body Pump is
+   Level : Integer := 0;
+
+   procedure Fill (X : in Integer) is
+   begin
+      Level := Level + X;
+   end Fill;
+
+   procedure Drain is
+   begin
+      if Level > 0 then
+         Level := Level - 1;
+      end if;
+   end Drain;
+
+   procedure Check is
+   begin
+      Safety_Handler;
+      Log (Level);
+   end Check;
+end Pump;
+"""
+
+def parse(code):
+    return AdaParser(AdaLexer(code)).parse_compilation_unit()
+
+def edited(code, anchor, text, length=0):
+    start = code.index(anchor)
+    return start, start + length, text
+
+class TestRelex(unittest.TestCase):
+    def assertRelexes(self, code, start, old_end, text):
+        new = code[:start] + text + code[old_end:]
+        previous = AdaLexer(code).tokenize_compact()
+        buf, damage = AdaLexer(new).relex(previous, start, old_end, start + len(text))
+        self.assertEqual(list(buf), AdaLexer(new).tokenize())
+        self.assertEqual(list(buf.line_starts), list(AdaLexer(new).tokenize_compact().line_starts))
+        return damage
+
+    def test_relex_scans_only_near_the_edit(self):
+        damage = self.assertRelexes(CODE, *edited(CODE, "Level - 1", "Level - 2", 9))
+        self.assertLessEqual(damage.new_end - damage.start, 6)
+
+    def test_relex_context_sensitive_edits(self):
+        for code, anchor, text, length in (
+            ("X := 1;\n", ";", ".5", 0),             # a NUMBER grows past its end
+            (CODE, "- 1", "-", 0),                      # MINUS becomes a comment
+            (CODE, "Integer := 0", "\n\n", 0),          # line breaks
+            ('X := "abc;\nY := 2;\n', "abc", '"', 0),   # closes a lone quote before the edit
+            ("Q := '\"';\nR := 1;\nS := 2;\n", "R", "T", 1), # edit inside a string spanning lines
+            # a quote after a lone quote right behind a STRING: the two become a "" escape
+            ('procedure P is\nbegin\n   Put_Line ("a""\n   );\n   Foo;\nend P;\n', "Foo;", 'Log("x");\n   ', 0),
+        ):
+            with self.subTest(anchor=anchor, text=text):
+                self.assertRelexes(code, *edited(code, anchor, text, length))
+
+    def test_relex_matches_full_lex_on_random_quote_edits(self):
+        pieces = ['"', '""', '"a"', 'X', ' ', '\n', ';', "'", "'\"'", '1.5', '--', 'Foo (', ')']
+        rng = random.Random(0)
+        for _ in range(2000):
+            code = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 25)))
+            start = rng.randint(0, len(code))
+            old_end = min(len(code), start + rng.choice([0, 0, 1, 2, 5]))
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 3)))
+            with self.subTest(code=code, edit=(start, old_end, text)):
+                self.assertRelexes(code, start, old_end, text)
+
+class TestIncrementalDocument(unittest.TestCase):
+    def test_edit_reparses_only_the_enclosing_subprogram(self):
+        doc = IncrementalDocument(CODE)
+        fill, drain, check = doc.unit.files[0].declarations[1:]
+        check_hash = node_hash(check)
+
+        new = CODE.replace("Level - 1", "Level - 2")
+        unit = doc.update(new)
+        self.assertEqual(unit, parse(new))
+        self.assertEqual(doc.reparsed, 2) # Pump and Drain
+        decls = unit.files[0].declarations
+        self.assertIs(decls[1], fill)
+        self.assertIsNot(decls[2], drain)
+        self.assertIs(decls[3], check)
+        self.assertEqual(check.struct_hash, check_hash)
+
+    def test_lines_after_the_edit_are_shifted(self):
+        doc = IncrementalDocument(CODE)
+        new = CODE.replace("Level := Level + X;", "Level := Level + X;\n      Level := Level + 1;\n")
+        unit = doc.update(new)
+        self.assertEqual(unit, parse(new))
+        check = unit.files[0].declarations[3]
+        self.assertEqual([s.line for s in check.statements], [20, 21])
+
+        # Further edits start from the updated state
+        newer = new.replace("Safety_Handler;", "null;")
+        self.assertEqual(doc.update(newer), parse(newer))
+
+    def test_recovers_after_a_failed_edit(self):
+        doc = IncrementalDocument(CODE)
+        broken = CODE.replace("begin\n      Level := Level + X;", "begin\n      Level := Level + X;\n   when")
+        with self.assertRaises(Exception):
+            doc.update(broken)
+        self.assertIsNone(doc.unit)
+        self.assertEqual(doc.update(CODE), parse(CODE))
+
+    def test_text_edit(self):
+        self.assertEqual(text_edit("abcdef", "abXYef"), (2, 4, 4))
+        self.assertEqual(text_edit("aaaa", "aaaaa"), (4, 4, 5))
+        self.assertEqual(text_edit("same", "same"), (4, 4, 4))
+
+class TestIngestorDocuments(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "pump.adb")
+        with open(self.path, "w") as f:
+            f.write(CODE)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_documents_are_updated_across_runs(self):
+        documents = {}
+        first = ParallelIngestor(max_workers=1, documents=documents).ingest(self.dir, "V1")
+        self.assertIn(self.path, documents)
+        self.assertIn("Pump.Drain", first.procedures)
+
+        with open(self.path, "w") as f:
+            f.write(CODE.replace("Log (Level);", "Log (Level);\n      Reset;"))
+        second = ParallelIngestor(max_workers=1, documents=documents).ingest(self.dir, "V2")
+        self.assertEqual(documents[self.path].reparsed, 2) # Pump and Check
+        self.assertIn("Reset", second.procedures["Pump.Check"].calls)
+
+if __name__ == '__main__':
+    unittest.main()
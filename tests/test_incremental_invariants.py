@@ -0,0 +1,87 @@
+import os
+import random
+import unittest
+from ada_semantic_analysis.core.ingestion import ParallelIngestor
+from ada_semantic_analysis.core.skm import SystemKnowledgeModel, ProcedureInfo, VariableInfo
+from ada_semantic_analysis.comparison.differ import SemanticDiffer
+from ada_semantic_analysis.comparison.invariant_checker import LegacyInvariantChecker
+from ada_semantic_analysis.comparison.rules import DEFAULT_RULES, load_rules
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+RULES = DEFAULT_RULES + load_rules([
+    {"id": "ARCH-01", "kind": "forbidden_dependency",
+     "callers": {"contains": ["ui"]}, "callees": {"contains": ["driver"]}},
+])
+
+def scenario_pairs():
+    pairs = [
+        ("scenarios/flight_control/v1", "scenarios/flight_control/v2"),
+        ("scenarios/test_v1", "scenarios/test_v2"),
+    ]
+    hard = os.path.join(ROOT, "tests", "scenarios_hard")
+    for name in sorted(os.listdir(hard)):
+        pairs.append((f"tests/scenarios_hard/{name}/v1", f"tests/scenarios_hard/{name}/v2"))
+    return pairs
+
+def summary(violations):
+    return [(v.rule_id, v.description, v.severity, v.location) for v in violations]
+
+def random_model(name, rng, base=None):
+    """A random system, or a mutation of `base` (same seed layout, some procedures edited/added/dropped)."""
+    skm = SystemKnowledgeModel(name)
+    for v in range(40):
+        skm.add_variable(VariableInfo(f"State_{v}" if v % 3 else f"Value_{v}", "Integer", f"Pkg_{v % 4}", "variable", 0))
+    roles = ["Ui", "Driver", "Safety", "Core"]
+    names = [f"Pkg_{i % 4}.{roles[i % 4]}_{i}" for i in range(60)]
+    if base is not None:
+        names = [n for n in names if rng.random() > 0.1] + [f"Pkg_9.{roles[i % 4]}_New_{i}" for i in range(5)]
+    for proc_name in names:
+        proc = ProcedureInfo(proc_name, "procedure", 0, 0, [], [])
+        skm.add_procedure(proc)
+        template = base.procedures.get(proc_name) if base is not None else None
+        if template is not None and rng.random() > 0.3:
+            writes, calls = template.written_vars, template.calls
+        else:
+            writes = {f"Pkg_{v % 4}.{'State' if v % 3 else 'Value'}_{v}" for v in rng.sample(range(40), 2)}
+            calls = {rng.choice(names).split('.')[-1] for _ in range(3)}
+        for var in sorted(writes):
+            skm.add_write(proc, var)
+        for callee in sorted(calls):
+            skm.add_call(proc_name, callee)
+    return skm
+
+class TestIncrementalInvariants(unittest.TestCase):
+    def assertEquivalent(self, old, new, rules=None):
+        differ = SemanticDiffer(old, new)
+        differ.diff()
+        full = LegacyInvariantChecker(old, new, rules).check()
+        incremental = LegacyInvariantChecker(old, new, rules).check(differ.changed_procedures)
+        self.assertEqual(summary(full), summary(incremental))
+        return full
+
+    def test_scenarios_match_full_check(self):
+        found = 0
+        for v1, v2 in scenario_pairs():
+            with self.subTest(scenario=v1):
+                ingestor = ParallelIngestor(max_workers=1)
+                old, new, _ = ingestor.ingest_pair(os.path.join(ROOT, v1), os.path.join(ROOT, v2))
+                found += len(self.assertEquivalent(old, new, RULES))
+        self.assertGreater(found, 0)
+
+    def test_random_edits_match_full_check(self):
+        rng = random.Random(7)
+        for trial in range(20):
+            with self.subTest(trial=trial):
+                old = random_model("V1", rng)
+                new = random_model("V2", rng, base=old)
+                self.assertEquivalent(old, new, RULES)
+
+    def test_nothing_dirty_checks_nothing(self):
+        rng = random.Random(3)
+        old = random_model("V1", rng)
+        checker = LegacyInvariantChecker(old, old, RULES)
+        self.assertEqual(checker.check(set()), [])
+
+if __name__ == '__main__':
+    unittest.main()
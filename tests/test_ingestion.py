@@ -0,0 +1,89 @@
+import os
+import unittest
+from ada_semantic_analysis.core import ingestion
+from ada_semantic_analysis.core.ingestion import ParallelIngestor, collect_sources, parse_source
+from ada_semantic_analysis.comparison.differ import SemanticDiffer
+
+SCENARIOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scenarios')
+
+def snapshot(skm):
+    return (
+        {n: (sorted(p.calls), sorted(p.written_vars), p.cyclomatic_complexity, p.call_locations, p.body_hash)
+         for n, p in skm.procedures.items()},
+        sorted(skm.variables),
+        sorted(skm.call_graph.edges),
+    )
+
+class TestParallelIngestor(unittest.TestCase):
+    def test_parallel_matches_serial(self):
+        path = os.path.join(SCENARIOS, 'flight_control', 'v2')
+        serial = ParallelIngestor(max_workers=1).ingest(path, "V2")
+        parallel = ParallelIngestor(max_workers=3).ingest(path, "V2")
+
+        self.assertTrue(serial.procedures)
+        self.assertEqual(snapshot(serial), snapshot(parallel))
+        self.assertEqual(list(serial.procedures), list(parallel.procedures))
+
+    def test_ingest_all_keeps_trees_apart(self):
+        v1 = os.path.join(SCENARIOS, 'test_v1')
+        v2 = os.path.join(SCENARIOS, 'test_v2')
+        skm1, skm2 = ParallelIngestor(max_workers=2).ingest_all([(v1, "V1"), (v2, "V2")])
+
+        self.assertEqual(skm1.name, "V1")
+        self.assertEqual(skm2.name, "V2")
+        self.assertIn("Main.To_Be_Renamed", skm1.procedures)
+        self.assertNotIn("Main.To_Be_Renamed", skm2.procedures)
+
+    def test_ingest_pair_reports_unchanged_procedures(self):
+        v1 = os.path.join(SCENARIOS, 'flight_control', 'v1')
+        v2 = os.path.join(SCENARIOS, 'flight_control', 'v2')
+        ingestor = ParallelIngestor(max_workers=1)
+        skm1, skm2, unchanged = ingestor.ingest_pair(v1, v2)
+
+        # logger.adb is byte-identical in both trees, main.adb is not.
+        self.assertIn("Logger.Log_Event", unchanged)
+        self.assertNotIn("Main", unchanged)
+
+        def as_rows(changes):
+            return sorted((c.file_name, c.line_range, c.classification, c.affected_files, c.risk) for c in changes)
+
+        full = SemanticDiffer(skm1, skm2).diff()
+        skipped = SemanticDiffer(skm1, skm2, unchanged_procedures=unchanged).diff()
+        self.assertEqual(as_rows(full), as_rows(skipped))
+
+    def test_lazy_bodies_match_eager_parsing(self):
+        v1 = os.path.join(SCENARIOS, 'flight_control', 'v1')
+        v2 = os.path.join(SCENARIOS, 'flight_control', 'v2')
+        for workers in (1, 3):
+            eager = ParallelIngestor(max_workers=workers).ingest_all([(v1, "V1"), (v2, "V2")])
+            lazy = ParallelIngestor(max_workers=workers, lazy_bodies=True).ingest_all([(v1, "V1"), (v2, "V2")])
+            self.assertEqual([snapshot(s) for s in lazy], [snapshot(s) for s in eager])
+            self.assertTrue(lazy[0].bodies)
+
+    def test_collect_sources_is_sorted(self):
+        paths = collect_sources(os.path.join(SCENARIOS, 'flight_control', 'v1'))
+        self.assertEqual(paths, sorted(paths))
+        self.assertTrue(all(p.endswith(('.adb', '.ads')) for p in paths))
+
+    def test_mmap_parse_matches_text_parse(self):
+        path = os.path.join(SCENARIOS, 'flight_control', 'v2')
+        threshold = ingestion.MMAP_THRESHOLD
+        for source in collect_sources(path):
+            try:
+                ingestion.MMAP_THRESHOLD = 0
+                mapped = parse_source(source)
+            finally:
+                ingestion.MMAP_THRESHOLD = threshold
+            self.assertEqual(mapped, parse_source(source))
+            self.assertIsNotNone(mapped[1])
+
+    def test_file_over_budget_is_reported_and_skipped(self):
+        path = os.path.join(SCENARIOS, 'flight_control', 'v2')
+        ingestor = ParallelIngestor(max_workers=1, token_budget=20)
+        skm = ingestor.ingest(path, "V2")
+        self.assertEqual(len(ingestor.errors), len(collect_sources(path)))
+        self.assertIn("Token budget", ingestor.errors[0][1])
+        self.assertFalse(skm.procedures)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from ada_semantic_analysis.core.lexer import AdaLexer
+from ada_semantic_analysis.core.parser import AdaParser
+from ada_semantic_analysis.core.skm import SystemKnowledgeModel, ProcedureInfo, VariableInfo
+from ada_semantic_analysis.core.skm_builder import SKMBuilder
+from ada_semantic_analysis.comparison.invariant_checker import LegacyInvariantChecker
+
+CODE = """
+package body Ctl is
+   procedure Safety_Check is begin null; end Safety_Check;
+   procedure Step is begin {call}; end Step;
+end Ctl;
+"""
+
+def build(code, name):
+    skm = SystemKnowledgeModel(name)
+    SKMBuilder(skm).build(AdaParser(AdaLexer(code)).parse_compilation_unit())
+    return skm
+
+def with_writers(name, writers):
+    skm = SystemKnowledgeModel(name)
+    skm.add_variable(VariableInfo("State", "Integer", "Ctl", "variable", 0))
+    for writer in writers:
+        proc = ProcedureInfo(writer, f"procedure {writer}", 0, 0, [], [])
+        skm.add_procedure(proc)
+        skm.add_write(proc, "Ctl.State")
+    return skm
+
+class TestLegacyInvariantChecker(unittest.TestCase):
+    def test_dropped_safety_call(self):
+        old = build(CODE.format(call="SAFETY_CHECK"), "V1")
+        new = build(CODE.format(call="null"), "V2")
+        violations = LegacyInvariantChecker(old, new).check()
+        self.assertEqual([(v.rule_id, v.location) for v in violations], [("INV-01", "Ctl.Step")])
+        self.assertIn("SAFETY_CHECK", violations[0].description)
+
+    def test_safety_call_through_qualified_name(self):
+        old = build(CODE.format(call="Safety_Check"), "V1")
+        new = build(CODE.format(call="Ctl.Safety_Check"), "V2")
+        self.assertEqual(LegacyInvariantChecker(old, new).check(), [])
+
+    def test_new_writer_of_state_variable(self):
+        old = with_writers("V1", ["Ctl.Init"])
+        new = with_writers("V2", ["Ctl.Init", "Ctl.Rogue"])
+        self.assertEqual(new.writers["Ctl.State"], {"Ctl.Init", "Ctl.Rogue"})
+        violations = LegacyInvariantChecker(old, new).check()
+        self.assertEqual([(v.rule_id, v.location) for v in violations], [("INV-02", "Ctl.State")])
+        self.assertTrue(violations[0].description.endswith(": Ctl.Rogue"))
+
+if __name__ == '__main__':
+    unittest.main()
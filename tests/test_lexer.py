@@ -0,0 +1,102 @@
+import os
+import random
+import tempfile
+import unittest
+from ada_semantic_analysis.core.lexer import AdaLexer, TokenStream
+
+CODE = """
+procedure Hello is
+   X : Integer := 10; -- counter
+begin
+   if X >= 5 then
+      Put_Line ("big");
+   end if;
+end Hello;
+"""
+
+class TestAdaLexer(unittest.TestCase):
+    def test_keywords_and_positions(self):
+        tokens = AdaLexer(CODE).tokenize()
+        self.assertEqual([t.type for t in tokens[:3]], ["PROCEDURE", "ID", "IS"])
+        self.assertEqual((tokens[1].value, tokens[1].line, tokens[1].column), ("Hello", 2, 10))
+        self.assertIn("GTE", [t.type for t in tokens])
+        self.assertEqual(tokens[-1].type, "EOF")
+
+    def test_iter_tokens_matches_tokenize(self):
+        self.assertEqual(list(AdaLexer(CODE).iter_tokens()), AdaLexer(CODE).tokenize())
+
+    def test_token_stream_window(self):
+        expected = AdaLexer(CODE).tokenize()
+        stream = TokenStream(AdaLexer(CODE).iter_tokens(), lookahead=2)
+        for i, tok in enumerate(expected):
+            stream.release(i)
+            self.assertEqual(stream.at(i), tok)
+        self.assertLessEqual(stream.max_buffered, 3)
+        self.assertEqual(stream.at(len(expected) + 5), stream.past_end)
+        with self.assertRaises(IndexError):
+            stream.at(0)
+
+    def test_token_stream_pin(self):
+        stream = TokenStream(AdaLexer(CODE).iter_tokens())
+        first = stream.at(3)
+        stream.pin(3)
+        stream.at(10)
+        stream.release(10)
+        self.assertEqual(stream.at(3), first)
+        stream.unpin(3)
+        stream.release(10)
+        with self.assertRaises(IndexError):
+            stream.at(3)
+
+    def test_compact_buffer_matches_tokenize(self):
+        # A character literal '"' opens a STRING spanning lines; its
+        # newlines do not count as line breaks in either form.
+        code = CODE + "Q := '\"';\nR := 1; -- \"\nS := 2;\n"
+        buf = AdaLexer(code).tokenize_compact()
+        self.assertEqual(list(buf), AdaLexer(code).tokenize())
+        self.assertEqual(buf.kind(1), "ID")
+        self.assertEqual(buf.value(1), "Hello")
+        self.assertEqual(buf.token(1).line, 2)
+        self.assertEqual(buf.nbytes(), 9 * len(buf) + 4 * len(buf.line_starts))
+
+    def test_table_backend_matches_regex(self):
+        code = CODE + "Q := '\"';\nR := 1.5E+3 /= 2 <> 3 => A..B; -- \"\nS := X'First | \u00b2 _ ~ \"a\"\"b\";\n"
+        for source in (code, code.encode('utf-8')):
+            self.assertEqual(AdaLexer(source, backend="table").tokenize(), AdaLexer(source).tokenize())
+        # Random soup of the characters the dispatch table special-cases
+        rng = random.Random(0)
+        alphabet = "aZ9_ \t\r\n\"'-:=/<>.;,()+*|#\u00e9\u0663"
+        for _ in range(200):
+            soup = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+            self.assertEqual(AdaLexer(soup, backend="table").tokenize(), AdaLexer(soup).tokenize(), soup)
+            self.assertEqual(list(AdaLexer(soup, backend="table").tokenize_compact()), AdaLexer(soup).tokenize(), soup)
+        with self.assertRaises(ValueError):
+            AdaLexer(CODE, backend="dfa")
+
+    def test_from_file_matches_decoded_text(self):
+        data = (CODE + 'Msg := "d\u00e9j\u00e0"; -- \u00e9t\u00e9\nZ := 1; -- \u00b0C\n').encode('utf-8') + b"W := \xff 2;\n"
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "unit.adb")
+            with open(path, "wb") as f:
+                f.write(data)
+            lexer = AdaLexer.from_file(path)
+            self.assertTrue(lexer.is_bytes)
+            self.assertEqual(lexer.tokenize(), AdaLexer(data.decode('utf-8', 'ignore')).tokenize())
+            buf = AdaLexer.from_file(path).tokenize_compact()
+            self.assertIn('"d\u00e9j\u00e0"', [buf.value(i) for i in range(len(buf))])
+            del lexer, buf # release the maps before the directory goes
+
+    def test_closing_a_mapped_lexer_keeps_its_buffers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "unit.adb")
+            with open(path, "w") as f:
+                f.write(CODE)
+            with AdaLexer.from_file(path) as lexer:
+                mapped = lexer.source_code
+                buf = lexer.tokenize_compact()
+            self.assertTrue(mapped.closed)
+            self.assertIsInstance(buf.source, bytes)
+            self.assertEqual(list(buf), AdaLexer(CODE).tokenize())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import unittest
+from ada_semantic_analysis.core.lexer import AdaLexer
+from ada_semantic_analysis.core.parser import AdaParser
+from ada_semantic_analysis.core.parse_cache import ParseCache
+from ada_semantic_analysis.core.ingestion import ParallelIngestor
+
+SOURCE = b"""
+procedure Main is
+   X : Integer := 0;
+begin
+   if X > 0 then
+      Helper(X);
+   end if;
+end Main;
+"""
+
+def parse(code: bytes):
+    return AdaParser(AdaLexer(code.decode())).parse_compilation_unit()
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_round_trip(self):
+        cache = ParseCache(self.dir)
+        key = cache.key(SOURCE)
+        self.assertIsNone(cache.get(key))
+
+        unit = parse(SOURCE)
+        cache.put(key, unit)
+        self.assertEqual(cache.get(key), unit)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_schema_change_invalidates(self):
+        old = ParseCache(self.dir, schema="old")
+        old.put(old.key(SOURCE), parse(SOURCE))
+
+        new = ParseCache(self.dir, schema="new")
+        self.assertNotEqual(old.key(SOURCE), new.key(SOURCE))
+        self.assertIsNone(new.get(new.key(SOURCE)))
+
+    def test_lru_eviction(self):
+        cache = ParseCache(self.dir)
+        unit = parse(SOURCE)
+        cache.put("a", unit)
+        entry_size = os.path.getsize(os.path.join(self.dir, "a" + ParseCache.SUFFIX))
+
+        cache = ParseCache(self.dir, max_bytes=entry_size * 2)
+        cache.put("b", unit)
+        # Make "a" the oldest, then touch it so "b" becomes least recently used.
+        os.utime(os.path.join(self.dir, "a" + ParseCache.SUFFIX), (1, 1))
+        os.utime(os.path.join(self.dir, "b" + ParseCache.SUFFIX), (2, 2))
+        self.assertIsNotNone(cache.get("a"))
+        cache.put("c", unit)
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_warm_ingest_skips_parsing(self):
+        src = os.path.join(self.dir, "src")
+        os.makedirs(src)
+        with open(os.path.join(src, "main.adb"), "wb") as fh:
+            fh.write(SOURCE)
+        cache = ParseCache(os.path.join(self.dir, "cache"))
+
+        cold = ParallelIngestor(max_workers=1, cache=cache).ingest(src, "V1")
+        self.assertEqual(cache.hits, 0)
+        warm = ParallelIngestor(max_workers=1, cache=cache).ingest(src, "V1")
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cold.procedures, warm.procedures)
+
+if __name__ == '__main__':
+    unittest.main()
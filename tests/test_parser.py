@@ -1,6 +1,7 @@
+import pickle
 import unittest
 from ada_semantic_analysis.core.lexer import AdaLexer
-from ada_semantic_analysis.core.parser import AdaParser
+from ada_semantic_analysis.core.parser import AdaParser, PartialAnalysisError
 from ada_semantic_analysis.core.ast_nodes import *
 
 class TestAdaParser(unittest.TestCase):
@@ -64,5 +65,183 @@ class TestAdaParser(unittest.TestCase):
         self.assertFalse(pkg.is_body)
         self.assertEqual(len(pkg.declarations), 2)
 
+    def test_streaming_matches_list_mode(self):
+        code = """
+        package body Ctl is
+           Limit : constant Integer := 3;
+           procedure Step (X : in out Integer) is
+           begin
+              Label_Like_Stmt Foo;
+              while X < Limit loop
+                 X := X + 1;
+                 Log (X);
+              end loop;
+           end Step;
+        end Ctl;
+        """
+        streaming = AdaParser(AdaLexer(code), streaming=True)
+        self.assertEqual(streaming.parse_compilation_unit(), AdaParser(AdaLexer(code)).parse_compilation_unit())
+        # Only a small window of tokens was ever held
+        self.assertLess(streaming.tokens.max_buffered, 8)
+        compact = AdaParser(AdaLexer(code), compact=True)
+        self.assertEqual(compact.parse_compilation_unit(), AdaParser(AdaLexer(code)).parse_compilation_unit())
+
+    def test_expression_text_is_a_lazy_token_span(self):
+        code = """
+        procedure Spin is
+        begin
+           while Count < Limit loop
+              Count := Count + 1;
+           end loop;
+        end Spin;
+        """
+        loop = AdaParser(AdaLexer(code)).parse_compilation_unit().files[0].statements[0]
+        scheme = loop.iteration_scheme
+        self.assertIsInstance(scheme, TokenSpan)
+        self.assertIsNone(scheme._text)
+        self.assertEqual(scheme, "WHILE Count < Limit ")
+        self.assertIsNone(scheme._tokens) # released once joined
+        self.assertEqual(loop.statements[0].expression, "Count + 1 ")
+
+        restored = pickle.loads(pickle.dumps(loop))
+        self.assertEqual(type(restored.iteration_scheme), str)
+        self.assertEqual(restored, loop)
+
+        streamed = AdaParser(AdaLexer(code), streaming=True).parse_compilation_unit().files[0].statements[0]
+        self.assertEqual(streamed.iteration_scheme, "WHILE Count < Limit ")
+
+    def test_truncated_input_terminates(self):
+        code = """
+        package body Pumps is
+           type State is record
+              Level : Integer;
+           end record;
+           procedure Run is
+           begin
+              case Mode is
+                 when Idle =>
+                    if Level > 0 then
+                       Call (A, B);
+                    end if;
+                 when others => null;
+              end case;
+           end Run;
+        end Pumps;
+        """
+        for cut in range(0, len(code), 7):
+            with self.subTest(cut=cut):
+                try:
+                    AdaParser(AdaLexer(code[:cut])).parse_compilation_unit()
+                except PartialAnalysisError:
+                    pass
+
+    def test_token_budget(self):
+        code = "procedure P is begin " + "X := X + 1; " * 50 + "end P;"
+        AdaParser(AdaLexer(code), token_budget=1000).parse_compilation_unit()
+        with self.assertRaises(PartialAnalysisError) as ctx:
+            AdaParser(AdaLexer(code), token_budget=100).parse_compilation_unit()
+        self.assertIn("Token budget", str(ctx.exception))
+        long_code = "procedure P is begin " + "X := X + 1; " * 500 + "end P;"
+        with self.assertRaises(PartialAnalysisError) as ctx:
+            AdaParser(AdaLexer(long_code), time_budget=0.0).parse_compilation_unit()
+        self.assertIn("Time budget", str(ctx.exception))
+
+    def test_lazy_bodies_are_parsed_on_first_use(self):
+        code = """
+        package body Pump is
+           procedure Fill (X : in Integer) is
+              type Empty is null record;
+           begin
+              if X > 0 then
+                 Level := (if X > 9 then 9 else X);
+              end if;
+              case X is
+                 when 1 =>
+                    loop
+                       exit;
+                    end loop;
+                 when others => null;
+              end case;
+              Done;
+           end Fill;
+           procedure Drain is
+           begin
+              Level := 0;
+           end Drain;
+        end Pump;
+        """
+        eager = AdaParser(AdaLexer(code)).parse_compilation_unit()
+        unit = AdaParser(AdaLexer(code), lazy_bodies=True).parse_compilation_unit()
+        fill, drain = unit.files[0].declarations
+        self.assertIsInstance(fill.statements, LazyStatements)
+        self.assertFalse(fill.statements.expanded)
+        self.assertEqual(fill.statements.line, 6)
+        self.assertEqual(pickle.loads(pickle.dumps(unit)), eager)
+        self.assertFalse(fill.statements.expanded)
+
+        self.assertEqual(unit, eager)
+        self.assertTrue(fill.statements.expanded)
+        self.assertEqual(drain.statements[0].line, 20)
+
+    def test_lazy_body_parse_stopping_early_is_flagged(self):
+        for body in ("select accept Go; or delay 1.0; end select; Log;",
+                     "if Ready then select accept Go; or delay 1.0; end select; end if; Log;"):
+            code = f"package body P is procedure Q0 is begin {body} end Q0; end P;"
+            with self.assertRaises(PartialAnalysisError):
+                AdaParser(AdaLexer(code)).parse_compilation_unit()
+            unit = AdaParser(AdaLexer(code), lazy_bodies=True).parse_compilation_unit()
+            for unit in (unit, pickle.loads(pickle.dumps(unit))):
+                with self.assertRaises(PartialAnalysisError):
+                    list(unit.files[0].declarations[0].statements)
+
+        # Deferred body parses are bounded by the file's budgets
+        long_code = "procedure P is begin " + "X := X + 1; " * 500 + "end P;"
+        unit = AdaParser(AdaLexer(long_code), token_budget=100, lazy_bodies=True).parse_compilation_unit()
+        with self.assertRaises(PartialAnalysisError) as ctx:
+            list(unit.files[0].statements)
+        self.assertIn("Token budget", str(ctx.exception))
+
+    def test_nodes_are_slotted(self):
+        node = IfNode(condition="X > 0", then_block=[], line=3)
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = 1
+        self.assertEqual(child_fields(IfNode), ("then_block", "elsif_parts", "else_block"))
+        self.assertEqual(child_fields(SubprogramNode), ("parameters", "declarations", "statements"))
+        self.assertEqual(child_fields(AssignmentNode), ())
+        self.assertEqual(pickle.loads(pickle.dumps(node)), node)
+
+    def test_recovery_reports_skipped_spans(self):
+        code = """
+        package body Pool is
+           task body Worker is
+           begin
+              accept Start;
+           end Worker;
+           procedure Swap is new Exchange (Item);
+           procedure Run is
+           begin
+              <<Retry>> Worker.Start;
+              Done;
+           end Run;
+        end Pool;
+        """
+        results = []
+        for mode in ({}, {"compact": True}, {"streaming": True}):
+            parser = AdaParser(AdaLexer(code), **mode)
+            unit = parser.parse_compilation_unit()
+            results.append((unit, parser.skipped))
+        self.assertEqual(results[1], results[0])
+        self.assertEqual(results[2], results[0])
+
+        unit, skipped = results[0]
+        self.assertEqual([(s.rule, s.line) for s in skipped], [("task", 3), ("instantiation", 7), ("statement", 10)])
+        tokens = AdaLexer(code).tokenize()
+        self.assertEqual(tokens[skipped[0].start].type, "TASK")
+        self.assertEqual(tokens[skipped[0].end - 1].type, "SEMI")
+        self.assertEqual(tokens[skipped[1].end].type, "SEMI")
+        run = unit.files[0].declarations[-1]
+        self.assertEqual([s.name for s in run.statements], ["Done"])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,54 @@
+import random
+import unittest
+from ada_semantic_analysis.core.skm import ProcedureInfo
+from ada_semantic_analysis.core.fingerprinting import BehavioralFingerprint
+from ada_semantic_analysis.comparison.rename_matcher import RenameMatcher
+
+def make_proc(name, rng):
+    params = rng.sample(["A", "B", "C"], rng.randint(0, 2))
+    outs = rng.sample(["R", "S"], rng.randint(0, 1))
+    proc = ProcedureInfo(name, f"procedure {name}", 0, 0, params, outs)
+    proc.cyclomatic_complexity = rng.randint(1, 6)
+    return proc
+
+def first_match_scan(removed, added):
+    """The original removed x added loop, used as the reference."""
+    pairs, taken = {}, set()
+    for r_name, p_old in removed:
+        fp_old = BehavioralFingerprint(p_old).fingerprint
+        for a_name, p_new in added:
+            if a_name in taken:
+                continue
+            fp_new = BehavioralFingerprint(p_new).fingerprint
+            if fp_old == fp_new or (
+                fp_old['inputs'] == fp_new['inputs'] and fp_old['outputs'] == fp_new['outputs']
+                and abs(fp_old['complexity'] - fp_new['complexity']) <= 1):
+                pairs[r_name] = a_name
+                taken.add(a_name)
+                break
+    return pairs
+
+class TestRenameMatcher(unittest.TestCase):
+    def test_same_matches_as_first_match_scan(self):
+        rng = random.Random(7)
+        removed = [(f"Old.P{i:03d}", make_proc(f"Old.P{i:03d}", rng)) for i in range(300)]
+        added = [(f"New.Q{i:03d}", make_proc(f"New.Q{i:03d}", rng)) for i in range(250)]
+
+        matcher = RenameMatcher(added)
+        indexed = {}
+        for r_name, proc in removed:
+            match = matcher.match(proc)
+            if match:
+                indexed[r_name] = match
+
+        self.assertTrue(indexed)
+        self.assertEqual(indexed, first_match_scan(removed, added))
+
+    def test_candidate_is_used_once(self):
+        a = ProcedureInfo("New.A", "procedure A", 0, 0, ["X"], [])
+        matcher = RenameMatcher([("New.A", a)])
+        self.assertEqual(matcher.match(ProcedureInfo("Old.A", "procedure A", 0, 0, ["X"], [])), "New.A")
+        self.assertIsNone(matcher.match(ProcedureInfo("Old.B", "procedure B", 0, 0, ["X"], [])))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import os
+import tempfile
+import unittest
+from ada_semantic_analysis.core.lexer import AdaLexer
+from ada_semantic_analysis.core.parser import AdaParser
+from ada_semantic_analysis.core.skm import SystemKnowledgeModel
+from ada_semantic_analysis.core.skm_builder import SKMBuilder
+from ada_semantic_analysis.comparison.invariant_checker import LegacyInvariantChecker
+from ada_semantic_analysis.comparison.rules import (
+    RuleEngine, NamePattern, ForbiddenDependencyRule, load_rules, DEFAULT_RULES
+)
+
+CODE = """
+package body App is
+   procedure Gui_Refresh is begin {call}; end Gui_Refresh;
+   procedure Driver_Write is begin null; end Driver_Write;
+   procedure Safety_Check is begin null; end Safety_Check;
+   procedure Tick is begin {tick}; end Tick;
+end App;
+"""
+
+SPEC = {"rules": [
+    {"id": "INV-01", "kind": "call_preservation", "severity": "High",
+     "targets": {"contains": ["safety"]}},
+    {"id": "ARCH-01", "kind": "forbidden_dependency", "severity": "High",
+     "callers": {"contains": ["gui"]}, "callees": {"regex": r"\.Driver_"}},
+]}
+
+def build(name, call="null", tick="Safety_Check"):
+    skm = SystemKnowledgeModel(name)
+    SKMBuilder(skm).build(AdaParser(AdaLexer(CODE.format(call=call, tick=tick))).parse_compilation_unit())
+    return skm
+
+class TestRuleEngine(unittest.TestCase):
+    def test_load_from_json_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rules.json")
+            with open(path, "w") as f:
+                json.dump(SPEC, f)
+            rules = load_rules(path)
+        self.assertEqual([r.rule_id for r in rules], ["INV-01", "ARCH-01"])
+        self.assertEqual(rules[1].callees, NamePattern(regex=r"\.Driver_"))
+        with self.assertRaises(ValueError):
+            load_rules([{"id": "X", "kind": "unknown"}])
+
+    def test_rules_share_one_plan(self):
+        old = build("V1")
+        new = build("V2", call="Driver_Write", tick="null")
+        engine = RuleEngine(load_rules(SPEC))
+        found = [(v.rule_id, v.location) for v in engine.check(old, new)]
+        self.assertEqual(found, [("INV-01", "App.Tick"), ("ARCH-01", "App.Gui_Refresh")])
+        self.assertEqual(set(engine.timings), {"INV-01", "ARCH-01"})
+
+    def test_existing_dependency_is_tolerated(self):
+        old = build("V1", call="Driver_Write")
+        new = build("V2", call="Driver_Write")
+        rule = ForbiddenDependencyRule("ARCH-01", NamePattern(("gui",)), NamePattern(("driver",)))
+        self.assertEqual(RuleEngine([rule]).check(old, new), [])
+
+    def test_default_rules_are_the_legacy_invariants(self):
+        old = build("V1")
+        new = build("V2", tick="null")
+        checker = LegacyInvariantChecker(old, new)
+        self.assertEqual([v.rule_id for v in checker.check()], ["INV-01"])
+        self.assertEqual(set(checker.timings), {r.rule_id for r in DEFAULT_RULES})
+
+if __name__ == '__main__':
+    unittest.main()
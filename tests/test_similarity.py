@@ -0,0 +1,65 @@
+import unittest
+from ada_semantic_analysis.core.skm import SystemKnowledgeModel, ProcedureInfo
+from ada_semantic_analysis.comparison.differ import SemanticDiffer
+from ada_semantic_analysis.comparison.similarity import SimilarityMatcher, jaccard, procedure_features
+
+def proc(name, calls, writes):
+    p = ProcedureInfo(name, f"procedure {name}", 0, 0, ["Input"], [])
+    p.calls.update(calls)
+    p.written_vars.update(writes)
+    return p
+
+class TestSimilarityMatcher(unittest.TestCase):
+    def setUp(self):
+        self.old = SystemKnowledgeModel("V1")
+        self.old.add_procedure(proc("Old.Alpha", ["A", "B", "C"], ["X"]))
+        self.old.add_procedure(proc("Old.Beta", ["D", "E", "F"], ["Y"]))
+        # Renamed and lightly edited; name order would cross-match them.
+        self.new = SystemKnowledgeModel("V2")
+        self.new.add_procedure(proc("New.A_Beta", ["D", "E", "F", "G"], ["Y"]))
+        self.new.add_procedure(proc("New.Z_Alpha", ["A", "B", "C", "H"], ["X"]))
+
+    def renames(self, **kwargs):
+        changes = SemanticDiffer(self.old, self.new, **kwargs).diff()
+        return sorted(c.classification for c in changes if "Renamed" in c.classification)
+
+    def test_similarity_pairs_edited_renames(self):
+        self.assertEqual(self.renames(), [
+            "Renamed Procedure (Old.Alpha -> New.Z_Alpha, 80% similar)",
+            "Renamed Procedure (Old.Beta -> New.A_Beta, 80% similar)",
+        ])
+
+    def test_signature_rule_alone_cross_matches(self):
+        self.assertEqual(self.renames(similarity_threshold=None), [
+            "Renamed Procedure (Old.Alpha -> New.A_Beta)",
+            "Renamed Procedure (Old.Beta -> New.Z_Alpha)",
+        ])
+
+    def test_threshold_and_exact_duplicates(self):
+        a = proc("P1.Work", ["A"], ["X"])
+        self.assertAlmostEqual(jaccard(procedure_features(a), procedure_features(proc("Q", ["A", "B"], ["X"]))), 2 / 3)
+
+        # Identical feature sets: the candidate in the same parent package wins.
+        matcher = SimilarityMatcher([("P0.Job", proc("P0.Job", ["A"], ["X"])), ("P1.Job", proc("P1.Job", ["A"], ["X"]))])
+        self.assertEqual(matcher.match("P1.Work", a), ("P1.Job", 1.0))
+        self.assertIsNone(SimilarityMatcher([("Q", proc("Q", ["A", "B", "C"], ["Z"]))]).match("P1.Work", a))
+
+    def test_interface_change_is_not_a_rename(self):
+        old = SystemKnowledgeModel("V1")
+        reset = ProcedureInfo("Pkg.Reset", "procedure Reset", 0, 0, ["Mode"], ["X"])
+        reset.calls.add("Log")
+        old.add_procedure(reset)
+        new = SystemKnowledgeModel("V2")
+        init = ProcedureInfo("Pkg.Init", "procedure Init", 0, 0, [], [])
+        init.calls.add("Log")
+        new.add_procedure(init)
+
+        for threshold in (0.8, None):
+            changes = SemanticDiffer(old, new, similarity_threshold=threshold).diff()
+            self.assertEqual(sorted((c.classification, c.risk) for c in changes), [
+                ("Code Inserted (New Procedure)", "Low"),
+                ("Variable/Code Removal", "High"),
+            ])
+
+if __name__ == '__main__':
+    unittest.main()
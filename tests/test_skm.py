@@ -1,8 +1,9 @@
 import unittest
 from ada_semantic_analysis.core.lexer import AdaLexer
-from ada_semantic_analysis.core.parser import AdaParser
+from ada_semantic_analysis.core.parser import AdaParser, PartialAnalysisError
 from ada_semantic_analysis.core.skm import SystemKnowledgeModel
 from ada_semantic_analysis.core.skm_builder import SKMBuilder
+from ada_semantic_analysis.core.ast_nodes import CallNode, CompilationUnitNode, IfNode, PackageNode, SubprogramNode
 
 class TestSKMBuilder(unittest.TestCase):
     def test_skm_extraction(self):
@@ -48,5 +49,115 @@ class TestSKMBuilder(unittest.TestCase):
         # Main has 1 IF -> complexity 2
         self.assertEqual(main.cyclomatic_complexity, 2)
 
+    def build(self, code):
+        skm = SystemKnowledgeModel("TestSystem")
+        SKMBuilder(skm).build(AdaParser(AdaLexer(code)).parse_compilation_unit())
+        return skm
+
+    def test_body_hash_is_structural(self):
+        code = """
+        procedure Main is
+           Limit : constant Integer := 10;
+        begin
+           if X > Limit then
+              Alarm(X);
+           end if;
+           X := 0;
+        end Main;
+        """
+        base = self.build(code).procedures["Main"]
+        moved = self.build("\n\n\n" + code).procedures["Main"]
+        edited = self.build(code.replace("10", "20")).procedures["Main"]
+
+        # Line shifts are not structural changes; a constant change is.
+        self.assertEqual(base.body_hash, moved.body_hash)
+        self.assertEqual(base.statement_hashes, moved.statement_hashes)
+        self.assertNotEqual(base.body_hash, edited.body_hash)
+        # Only the declaration changed, so the statements hash the same.
+        self.assertEqual(base.statement_hashes, edited.statement_hashes)
+        self.assertEqual(len(base.statement_hashes), 2)
+
+    def test_name_resolution_index(self):
+        code = """
+        package body Nav is
+           Mode : Integer;
+           procedure Reset is begin Mode := 0; end Reset;
+        end Nav;
+        """
+        skm = self.build(code)
+        self.assertEqual(skm.resolve_procedure("Reset"), {"Nav.Reset"})
+        self.assertEqual(skm.resolve_procedure("nav.RESET"), {"Nav.Reset"})
+        self.assertEqual(skm.resolve_procedure("Other.Reset"), set())
+        self.assertEqual(skm.resolve_variable("MODE"), {"Nav.Mode"})
+
+class TestWalker(unittest.TestCase):
+    def test_deep_nesting_does_not_recurse(self):
+        body = [CallNode(name="Fire", arguments=[], line=7)]
+        for _ in range(3000):
+            body = [IfNode(condition="X", then_block=body)]
+        main = SubprogramNode(name="Main", kind="procedure", statements=body)
+        helper = SubprogramNode(name="Helper", kind="procedure", statements=[CallNode(name="Main", arguments=[], line=9)])
+        unit = CompilationUnitNode(files=[PackageNode(name="Deep", is_body=True, declarations=[main, helper])])
+
+        skm = SystemKnowledgeModel("Test")
+        builder = SKMBuilder(skm)
+        self.assertEqual(builder.build(unit), {"Deep.Main", "Deep.Helper"})
+        self.assertEqual(skm.procedures["Deep.Main"].cyclomatic_complexity, 3001)
+        self.assertEqual(skm.procedures["Deep.Main"].call_locations, {"Fire": [7]})
+        self.assertEqual(skm.procedures["Deep.Helper"].calls, {"Main"})
+        self.assertEqual(builder.current_scope, [])
+        self.assertIsNone(builder.current_proc)
+        self.assertIs(SKMBuilder.dispatch_table()[IfNode], SKMBuilder.visit_IfNode)
+
+class TestLazyBodies(unittest.TestCase):
+    CODE = """
+    package body Pump is
+       procedure Fill is
+       begin
+          if Level < 9 then
+             Level := Level + 1;
+             Notify (Level);
+          end if;
+       end Fill;
+       procedure Drain is
+       begin
+          Level := 0;
+       end Drain;
+    end Pump;
+    """
+
+    def build(self, code, lazy, baseline=None):
+        skm = SystemKnowledgeModel("Test")
+        unit = AdaParser(AdaLexer(code), lazy_bodies=lazy).parse_compilation_unit()
+        SKMBuilder(skm, baseline).build(unit)
+        return skm, unit
+
+    def test_unchanged_bodies_are_taken_from_the_baseline(self):
+        baseline, _ = self.build(self.CODE, lazy=True)
+        self.assertEqual(len(baseline.bodies), 2)
+
+        # Fill moves down two lines, Drain changes
+        new = self.CODE.replace("package body Pump is", "package body Pump is\n\n").replace("Level := 0", "Level := 1")
+        skm, unit = self.build(new, lazy=True, baseline=baseline)
+        fill, drain = unit.files[0].declarations
+        self.assertFalse(fill.statements.expanded)
+        self.assertTrue(drain.statements.expanded)
+
+        expected, _ = self.build(new, lazy=False)
+        for name, proc in expected.procedures.items():
+            self.assertEqual(skm.procedures[name], proc)
+        self.assertEqual(skm.procedures["Pump.Fill"].call_locations, {"Notify": [9]})
+        self.assertEqual(skm.writers, expected.writers)
+
+    def test_body_failing_to_parse_leaves_no_scope_behind(self):
+        broken = self.CODE.replace("Level := 0;", "Level := 0;\n    exception when others => null;")
+        builder = SKMBuilder(SystemKnowledgeModel("Test"))
+        with self.assertRaises(PartialAnalysisError):
+            builder.build(AdaParser(AdaLexer(broken), lazy_bodies=True).parse_compilation_unit())
+        self.assertEqual(builder.current_scope, [])
+        self.assertIsNone(builder.current_proc)
+        # Drain fails to parse: Fill, visited first, is not added either
+        self.assertEqual(builder.skm.procedures, {})
+
 if __name__ == '__main__':
     unittest.main()